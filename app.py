@@ -1,15 +1,17 @@
-from flask import Flask, render_template, request, jsonify, redirect
+from flask import Flask, render_template, request, jsonify, redirect, url_for
 import requests
 from typing import List, Dict, Optional, Any
 from datetime import datetime
 import json
 from dotenv import load_dotenv
 import os
-from services.github_service import GitHubService
+from services.github_service import GitHubService, fetch_context
 from services.gemini_service import GeminiService
 from services.analysis_service import AnalysisService
+from services.job_service import JobService, analysis_key
 from utils.error_handler import handle_api_error
 from utils.url_validator import validate_repo_url
+from utils.single_flight import SingleFlight
 
 # Load environment variables
 load_dotenv()
@@ -17,12 +19,28 @@ load_dotenv()
 # Initialize Flask app
 app = Flask(__name__)
 
-# Initialize services
-github_service = GitHubService()
-gemini_service = GeminiService()
-analysis_service = AnalysisService()
+# Initialize services. Analysis worker processes started with forkserver or
+# spawn import this module as __mp_main__; they only run the per-file
+# detectors, so they must not build services or recover jobs.
+if __name__ != '__mp_main__':
+    github_service = GitHubService()
+    gemini_service = GeminiService()
+    analysis_service = AnalysisService()
+    # Concurrent identical analyses (web requests and jobs) share one computation
+    analysis_flights = SingleFlight()
+    job_service = JobService(analysis_service, single_flight=analysis_flights)
+
+def shared_analysis(username: str, repo_name: str, target: str, compute, base_sha: Optional[str] = None):
+    """Run compute once for concurrent identical requests and share its result.
+
+    target names the AnalysisService method compute calls. compute is
+    given a progress callback that reaches jobs waiting on the same analysis.
+    """
+    key = analysis_key(username, repo_name, target, base_sha)
+    return analysis_flights.do(key, lambda: compute(lambda message: analysis_flights.report(key, message)))
 
 @app.route('/', methods=['GET', 'POST'])
+@fetch_context()
 def index():
     if request.method == 'POST':
         repo_url = request.form.get('repo_url')
@@ -47,7 +65,8 @@ def index():
                 
                 # Get analysis based on action
                 if action == 'generate_readme':
-                    result = analysis_service.generate_readme(username, repo_name)
+                    result = shared_analysis(username, repo_name, 'generate_readme',
+                                             lambda progress: analysis_service.generate_readme(username, repo_name))
                     if 'error' in result:
                         return render_template('index.html', error=result['error'])
                     return render_template('analysis.html', 
@@ -58,7 +77,8 @@ def index():
                                         analysis=result['analysis'])
                 elif action == 'code_feedback':
                     try:
-                        result = analysis_service.get_code_feedback(username, repo_name)
+                        result = shared_analysis(username, repo_name, 'get_code_feedback',
+                                                 lambda progress: analysis_service.get_code_feedback(username, repo_name))
                         if not result or 'error' in result:
                             error = result.get('error', "Failed to generate code feedback")
                             return render_template('index.html', error=error)
@@ -75,9 +95,16 @@ def index():
                 elif action == 'complete_analysis':
                     try:
                         view_type = request.form.get('view_type', 'repo') # Default to 'repo'
+                        # Commit of a previous analysis; only files changed since then are re-analyzed
+                        base_sha = request.form.get('base_sha') or None
 
                         if view_type == 'repo':
-                            result = analysis_service.get_full_analysis(username, repo_name)
+                            result = shared_analysis(
+                                username, repo_name, 'get_full_analysis',
+                                lambda progress: analysis_service.get_full_analysis(username, repo_name, base_sha=base_sha,
+                                                                                    progress=progress),
+                                base_sha=base_sha
+                            )
 
                             # CRITICAL CHECK: Ensure result is a dictionary
                             if not isinstance(result, dict):
@@ -201,7 +228,12 @@ def index():
                                                 result=analysis_result)
                         else:
                             # This part handles other view_types like 'developer'
-                            result_data = analysis_service.get_full_analysis(username, repo_name)
+                            result_data = shared_analysis(
+                                username, repo_name, 'get_full_analysis',
+                                lambda progress: analysis_service.get_full_analysis(username, repo_name, base_sha=base_sha,
+                                                                                    progress=progress),
+                                base_sha=base_sha
+                            )
                             return render_template('index.html', result=result_data)
 
                     except Exception as e:
@@ -211,7 +243,9 @@ def index():
                         traceback.print_exc()
                         return render_template('index.html', error=error)
                 else:
-                    result = analysis_service.get_full_analysis(username, repo_name)
+                    result = shared_analysis(username, repo_name, 'get_full_analysis',
+                                             lambda progress: analysis_service.get_full_analysis(username, repo_name,
+                                                                                                 progress=progress))
                     if view_type == 'developer':
                         return redirect(f'/developer/{username}/{repo_name}')
                     else:
@@ -225,6 +259,7 @@ def index():
     return render_template('index.html')
 
 @app.route('/developer/<username>/<repo_name>')
+@fetch_context()
 def developer_view(username, repo_name):
     try:
         result = analysis_service.get_developer_analysis(username, repo_name)
@@ -240,6 +275,49 @@ def developer_view(username, repo_name):
         print(f"Full error: {e}")
         return render_template('index.html', error=error)
 
+@app.route('/jobs', methods=['POST'])
+def submit_job():
+    payload = request.get_json(silent=True) or request.form
+    repo_url = payload.get('repo_url')
+    repo_info = validate_repo_url(repo_url) if repo_url else None
+    if not repo_info:
+        return jsonify({'error': "Invalid GitHub repository URL. Please enter a valid URL like 'https://github.com/username/repo'."}), 400
+
+    action = payload.get('action', 'complete_analysis')
+    if action not in JobService.ACTIONS:
+        return jsonify({'error': f"Unsupported action '{action}'. Expected one of: {', '.join(JobService.ACTIONS)}"}), 400
+
+    username, repo_name = repo_info
+    job_id = job_service.submit(
+        username, repo_name,
+        action=action,
+        view_type=payload.get('view_type', 'repo'),
+        base_sha=payload.get('base_sha') or None
+    )
+    return jsonify({'job_id': job_id, 'status_url': url_for('get_job', job_id=job_id)}), 202
+
+@app.route('/jobs/<job_id>')
+def get_job(job_id):
+    job = job_service.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job)
+
+@app.route('/metrics')
+def metrics():
+    return jsonify({
+        'http_pools': {
+            'github': github_service.pool_stats(),
+            'gemini': gemini_service.pool_stats()
+        },
+        'github_rate_limit': github_service.rate_limit_stats(),
+        'git_mirrors': github_service.git_mirror.stats(),
+        'github_response_cache': github_service.response_cache.stats() if github_service.response_cache else None,
+        'blob_cache': analysis_service.blob_cache.stats() if analysis_service.blob_cache else None,
+        'jobs': job_service.stats(),
+        'single_flight': analysis_flights.stats()
+    })
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True) 
     
\ No newline at end of file
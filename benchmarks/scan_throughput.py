@@ -0,0 +1,66 @@
+"""Measure per-file detector throughput: code_scanner alone vs the full analyze_file.
+
+Usage: python benchmarks/scan_throughput.py [PATH ...]
+
+Every text file under the given paths (the repository itself by default)
+is loaded into memory once, then each implementation is timed over the
+whole set. analyze_file adds the Python AST pass and manifest parsing.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import file_analyzer  # noqa: E402
+from services.code_scanner import scan_file  # noqa: E402
+
+SKIP_DIRS = {'.git', '.cache', '__pycache__', 'node_modules', 'venv', '.venv'}
+
+
+def load_files(roots):
+    files = []
+    for root in roots:
+        for directory, dirs, names in os.walk(root):
+            dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
+            for name in names:
+                path = os.path.join(directory, name)
+                try:
+                    with open(path, encoding='utf-8') as f:
+                        files.append((path, f.read()))
+                except (OSError, UnicodeDecodeError):
+                    continue
+    return files
+
+
+def scanner(path, content):
+    return scan_file(path, content, file_analyzer.detect_language(path, content))
+
+
+def measure(func, files, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for path, content in files:
+            func(path, content)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    roots = sys.argv[1:] or [os.path.dirname(os.path.dirname(os.path.abspath(__file__)))]
+    files = load_files(roots)
+    if not files:
+        sys.exit('No text files found')
+    megabytes = sum(len(content.encode('utf-8')) for _, content in files) / (1024 * 1024)
+
+    print(f"{len(files)} files, {megabytes:.1f} MB")
+    baseline = None
+    for name, func in (('code_scanner', scanner), ('analyze_file', file_analyzer.analyze_file)):
+        elapsed = measure(func, files, repeat=5)
+        baseline = baseline or elapsed
+        print(f"{name:20s} {megabytes / elapsed:8.1f} MB/s  {baseline / elapsed:5.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,31 +1,232 @@
-from typing import Dict, Any, List, Optional, Set
-import pandas as pd
+from typing import Dict, Any, List, Optional, Iterable, Iterator, Tuple, Callable
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import os
-import requests
-from services.github_service import GitHubService
+import time
+from services.github_service import GitHubService, fetch_context
 from services.gemini_service import GeminiService
-import re
+from services.local_repository_service import LocalRepositoryService
+from services import file_analyzer
+from services.file_analyzer import ParallelFileAnalyzer
+from services.manifest_parsers import is_manifest
+from utils.concurrency import submit_with_context
+from utils.blob_cache import shared_blob_cache
+from utils.repo_metrics import ContributorMetrics, IssueMetrics, collect
+from utils.sampling import AnalysisBudget, extrapolate, stratum_of
+from utils.path_filters import DEFAULT_IGNORE_GLOBS, PathFilter
+
+# Bump whenever per-file detector output or the snapshot layout changes so cached results are not reused
+FILE_ANALYSIS_VERSION = 5
 
 class AnalysisService:
-    def __init__(self):
-        self.github_service = GitHubService()
-        self.gemini_service = GeminiService()
+    def __init__(self, github_service: Optional[Any] = None, gemini_service: Optional[GeminiService] = None):
+        # Any object with GitHubService's interface works, e.g. LocalRepositoryService
+        self.github_service = github_service or GitHubService()
+        self.gemini_service = gemini_service or GeminiService()
+        # Upper bound on concurrent GitHub calls issued by a single analysis
+        self.max_workers = int(os.getenv('ANALYSIS_MAX_WORKERS', '8'))
+        # Stream contents from the repository tarball once this many files are needed and
+        # they make up this share of the tree the tarball carries
+        self.archive_threshold = int(os.getenv('ANALYSIS_ARCHIVE_THRESHOLD', '50'))
+        self.archive_min_share = float(os.getenv('ANALYSIS_ARCHIVE_MIN_SHARE', '0.25'))
+        # Contributors and issues kept for display; metrics still cover every page fetched
+        self.max_listed_items = int(os.getenv('ANALYSIS_MAX_LISTED_ITEMS', '100'))
+        # Per-file detectors run in worker processes once an analysis has this many files
+        self.process_workers = int(os.getenv('ANALYSIS_PROCESS_WORKERS', str(min(4, os.cpu_count() or 1))))
+        self.process_min_files = int(os.getenv('ANALYSIS_PROCESS_MIN_FILES', '500'))
+        # Files left out by path or listed size before any content is fetched
+        self.ignore_globs = [glob.strip() for glob in os.getenv('ANALYSIS_IGNORE_GLOBS', ','.join(DEFAULT_IGNORE_GLOBS)).split(',')]
+        self.max_file_bytes = int(os.getenv('ANALYSIS_MAX_FILE_BYTES', str(1024 * 1024)))
+        self.honor_gitattributes = os.getenv('ANALYSIS_HONOR_GITATTRIBUTES', 'true').lower() != 'false'
+        # Budgeted mode for huge repositories: analyze a prioritized sample and extrapolate
+        self.budget = AnalysisBudget(
+            max_files=int(os.getenv('ANALYSIS_MAX_FILES', '0')),
+            max_bytes=int(os.getenv('ANALYSIS_MAX_BYTES', '0')),
+            max_seconds=float(os.getenv('ANALYSIS_MAX_SECONDS', '0'))
+        )
+        # Decoded contents and per-file results keyed by git blob SHA
+        self.blob_cache = None
+        if os.getenv('ANALYSIS_CACHE_ENABLED', 'true').lower() != 'false':
+            self.blob_cache = shared_blob_cache(
+                os.getenv('ANALYSIS_CACHE_DIR', os.path.join('.cache', 'blobs')),
+                int(os.getenv('ANALYSIS_CACHE_MAX_BYTES', str(512 * 1024 * 1024)))
+            )
 
-    def get_full_analysis(self, username: str, repo_name: str) -> Dict[str, Any]:
-        """Get complete repository analysis."""
+    @classmethod
+    def for_local_repository(cls, path: str, ref: str = 'HEAD') -> 'AnalysisService':
+        """Analyze a local working tree or bare repository without calling the GitHub API."""
+        return cls(github_service=LocalRepositoryService(path, ref))
+
+    def _fetch_repository_data(self, username: str, repo_name: str, resources: Iterable[str]) -> Dict[str, Any]:
+        """Fetch independent GitHub resources concurrently and join the results.
+
+        Contributors and issues are streamed page by page: their metrics are
+        accumulated as pages arrive and returned as '<name>_metrics', while
+        only the first max_listed_items items are kept.
+
+        Metadata, README and open issues are first requested in one GraphQL
+        round-trip where the service supports it; the REST fetchers below
+        then answer from the primed fetch context.
+        """
+        resources = list(resources)
+        overview = None
+        get_overview = getattr(self.github_service, 'get_repository_overview', None)
+        if get_overview and {'repository', 'readme', 'issues'} & set(resources):
+            try:
+                overview = get_overview(username, repo_name)
+            except Exception as e:
+                print(f"AnalysisService: GraphQL overview for {username}/{repo_name} failed: {str(e)}")
+
+        fetchers = {
+            'repository': self.github_service.get_repository,
+            'contributors': lambda u, r: self._collect_stream(self.github_service.iter_contributors(u, r), ContributorMetrics()),
+            'commit_activity': self.github_service.get_commit_activity,
+            'issues': lambda u, r: self._collect_stream(
+                overview['issues'] if overview and overview['issues_complete'] else self.github_service.iter_issues(u, r),
+                IssueMetrics()
+            ),
+            'readme': self.github_service.get_readme,
+            # Listed at the head commit so the listing and the contents read later agree
+            'contents': lambda u, r: self.github_service.get_repository_contents(
+                u, r, ref=self.github_service.get_head_commit(u, r)
+            ),
+            'head_commit': self.github_service.get_head_commit,
+        }
+        futures: Dict[str, Any] = {}
+        if 'contents' in resources and 'readme' in resources:
+            # The README is then read from the listing instead of being looked up on its own
+            def get_readme_after_listing(u: str, r: str) -> Optional[str]:
+                futures['contents'].exception()
+                return self.github_service.get_readme(u, r)
+            fetchers['readme'] = get_readme_after_listing
+            # Submitted first so the README task never waits on a queued listing
+            resources.sort(key=lambda name: name != 'contents')
+
+        results: Dict[str, Any] = {}
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(resources)))) as executor:
+            for name in resources:
+                futures[name] = submit_with_context(executor, fetchers[name], username, repo_name)
+            for name, future in futures.items():
+                try:
+                    results[name] = future.result()
+                    if name in ('contributors', 'issues'):
+                        results[name], results[f'{name}_metrics'] = results[name]
+                except Exception as e:
+                    print(f"AnalysisService: fetching {name} for {username}/{repo_name} failed: {str(e)}")
+                    results[name] = None
+        return results
+
+    def _collect_stream(self, items: Iterable[Dict[str, Any]], metrics: Any) -> Tuple[List[Dict[str, Any]], Any]:
+        """Accumulate metrics over a paginated stream, keeping the first max_listed_items items."""
+        return collect(items, metrics, self.max_listed_items)
+
+    def _iter_file_contents(self, username: str, repo_name: str, files: List[Dict[str, Any]],
+                            use_archive: bool = True, ref: Optional[str] = None,
+                            listed: Optional[List[Dict[str, Any]]] = None) -> Iterator[Tuple[Dict[str, Any], Optional[str]]]:
+        """Yield (item, content) for each file at ref, in no particular order.
+
+        Blobs already in the cache are served from it. Batches that are a
+        large part of the listed tree are streamed from the repository
+        tarball unless use_archive is False; anything the archive did not
+        provide is fetched concurrently through the per-file API.
+        """
+        if self.blob_cache:
+            uncached = []
+            for item in files:
+                content = self.blob_cache.get_content(item['sha']) if item.get('sha') else None
+                if content is None:
+                    uncached.append(item)
+                else:
+                    yield item, content
+            files = uncached
+
+        for item, content in self._fetch_file_contents(username, repo_name, files, use_archive, ref, listed):
+            if self.blob_cache and item.get('sha') and content is not None:
+                self.blob_cache.put_content(item['sha'], content)
+            yield item, content
+
+    def _archive_pays_off(self, files: List[Dict[str, Any]], listed: Optional[List[Dict[str, Any]]]) -> bool:
+        """Whether one tarball of the whole tree beats fetching files one by one.
+
+        The tarball carries every listed file, so at least archive_threshold
+        files must be wanted and they must make up archive_min_share of the
+        listing: by bytes when the listing has sizes, by count otherwise.
+        Services that read from a local git repository have no tarball;
+        their batch read is always cheaper.
+        """
+        if getattr(self.github_service, 'reads_locally', False):
+            return bool(files)
+        if not self.archive_threshold or len(files) < self.archive_threshold:
+            return False
+        if not listed:
+            return True
+        listed_bytes = sum(item.get('size') or 0 for item in listed)
+        if listed_bytes and all(item.get('size') is not None for item in files):
+            share = sum(item.get('size') or 0 for item in files) / listed_bytes
+        else:
+            share = len(files) / len(listed)
+        return share >= self.archive_min_share
+
+    def _fetch_file_contents(self, username: str, repo_name: str, files: List[Dict[str, Any]],
+                             use_archive: bool = True, ref: Optional[str] = None,
+                             listed: Optional[List[Dict[str, Any]]] = None) -> Iterator[Tuple[Dict[str, Any], Optional[str]]]:
+        """Fetch file contents from GitHub, preferring the tarball when most of the tree is needed."""
+        if use_archive and self._archive_pays_off(files, listed):
+            remaining = {item.get('path', ''): item for item in files}
+            try:
+                for path, content in self.github_service.iter_file_contents(username, repo_name, list(remaining), ref=ref):
+                    item = remaining.pop(path, None)
+                    if item is not None:
+                        yield item, content
+            except Exception as e:
+                print(f"AnalysisService: archive download for {username}/{repo_name} failed: {str(e)}")
+            files = list(remaining.values())
+
+        if not files:
+            return
+        executor = ThreadPoolExecutor(max_workers=max(1, self.max_workers))
+        try:
+            futures = [
+                submit_with_context(executor, self.github_service.get_file_content,
+                                    username, repo_name, item.get('path', ''), ref=ref)
+                for item in files
+            ]
+            for item, future in zip(files, futures):
+                yield item, future.result()
+        finally:
+            # A caller that stops early (e.g. out of time budget) should not wait for the rest
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    @fetch_context()
+    def get_full_analysis(self, username: str, repo_name: str, base_sha: Optional[str] = None,
+                          progress: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """Get complete repository analysis.
+
+        When base_sha names a commit analyzed before, only the files changed
+        since that commit are fetched and re-analyzed. progress, if given, is
+        called with a short message as each stage starts.
+        """
         try:
-            repo_data = self.github_service.get_repository(username, repo_name)
+            if progress:
+                progress('Fetching repository data')
+            previous = self._load_snapshot(username, repo_name, base_sha) if base_sha else None
+            resources = ['repository', 'contributors', 'commit_activity', 'issues', 'readme', 'head_commit']
+            if previous is None:
+                resources.append('contents')
+            fetched = self._fetch_repository_data(username, repo_name, resources)
+            head_sha = fetched['head_commit']
+
+            repo_data = fetched['repository']
             if not isinstance(repo_data, dict):
                 print(f"AnalysisService: repo_data is not a dict: {type(repo_data)}")
                 repo_data = {}
 
-            contributors = self.github_service.get_contributors(username, repo_name)
+            contributors = fetched['contributors']
             if not isinstance(contributors, list):
                 print(f"AnalysisService: contributors is not a list: {type(contributors)}")
                 contributors = []
 
-            activity_data = self.github_service.get_commit_activity(username, repo_name)
+            activity_data = fetched['commit_activity']
             if not isinstance(activity_data, dict):
                 # get_commit_activity is expected to return a dict or None
                 print(f"AnalysisService: activity_data is not a dict: {type(activity_data)}")
@@ -43,29 +244,44 @@ class AnalysisService:
                 # Generate weeks if not provided
                 weeks = [f"Week {i+1}" for i in range(len(activity_data))]
 
-            issues_data = self.github_service.get_issues(username, repo_name)
+            issues_data = fetched['issues']
             issues_data_list = issues_data if isinstance(issues_data, list) else []
-            
-            issues_analysis = self.gemini_service.analyze_issues(issues_data_list)
-            if not isinstance(issues_analysis, dict):
-                print(f"AnalysisService: issues_analysis from Gemini is not a dict: {type(issues_analysis)}")
-                issues_analysis = {'trend': 'N/A', 'priorities': [], 'issues': []}
 
-            readme_content = self.github_service.get_readme(username, repo_name)
+            readme_content = fetched['readme']
             readme_str = readme_content if isinstance(readme_content, str) else ""
             
             # Get repository contents for analysis - FIXED
-            contents = self.github_service.get_repository_contents(username, repo_name)
+            if previous is not None:
+                # Incremental mode: derive the listing from the stored snapshot plus the commit diff
+                contents = self._apply_commit_diff(username, repo_name, previous, base_sha, head_sha)
+                if contents is None:
+                    print(f"AnalysisService: cannot diff {base_sha}...{head_sha}, falling back to a full listing")
+                    contents = self.github_service.get_repository_contents(username, repo_name, ref=head_sha)
+            else:
+                contents = fetched['contents']
             # Ensure contents is a list
             if not isinstance(contents, list):
                 print(f"AnalysisService: contents is not a list: {type(contents)}")
                 contents = []
             
             # Analyze code files - FIXED: Pass contents list instead of default_branch
-            code_analysis = self._analyze_code_files(username, repo_name, contents)
+            if progress:
+                progress(f'Analyzing {len(contents)} files')
+            code_analysis = self._analyze_code_files(username, repo_name, contents,
+                                                     previous=previous, commit_sha=head_sha)
             
-            # Get repository statistics
-            stats = self._get_repository_stats(username, repo_name)
+            # Repository statistics are built from the data fetched above
+            stats = self._build_repository_stats(
+                repo_data, contributors, fetched['commit_activity'], issues_data
+            )
+
+            # Every GitHub call has been joined; only the Gemini steps remain
+            if progress:
+                progress('Generating AI insights')
+            issues_analysis = self.gemini_service.analyze_issues(issues_data_list)
+            if not isinstance(issues_analysis, dict):
+                print(f"AnalysisService: issues_analysis from Gemini is not a dict: {type(issues_analysis)}")
+                issues_analysis = {'trend': 'N/A', 'priorities': [], 'issues': []}
             
             # Generate README using the correct method name and parameters
             generated_readme = self.gemini_service.generate_readme(
@@ -82,7 +298,9 @@ class AnalysisService:
             # REMOVED THE DUPLICATE CODE ANALYSIS CALL
             # The code_analysis is already calculated above, no need to call it again
             
-            metrics = self._calculate_metrics(repo_data, contributors, issues_data_list, activity_data)
+            metrics = self._calculate_metrics(repo_data, contributors, issues_data_list, activity_data,
+                                              contributor_metrics=fetched.get('contributors_metrics'),
+                                              issue_metrics=fetched.get('issues_metrics'))
             if not isinstance(metrics, dict):
                 print(f"AnalysisService: _calculate_metrics did not return a dict: {type(metrics)}")
                 metrics = {}
@@ -101,7 +319,8 @@ class AnalysisService:
                 'readme': generated_readme, # Already ensured to be a string
                 'issues': issues_analysis, # Already ensured to be a dict
                 'code_analysis': code_analysis, # Already ensured to be a dict
-                'metrics': metrics # Already ensured to be a dict
+                'metrics': metrics, # Already ensured to be a dict
+                'commit_sha': head_sha # Pass back as base_sha for an incremental re-analysis
             }
         except Exception as e:
             print(f"CRITICAL ERROR in AnalysisService.get_full_analysis for {username}/{repo_name}: {str(e)}")
@@ -109,6 +328,7 @@ class AnalysisService:
             traceback.print_exc()
             return {"error": f"Internal server error during full analysis: {str(e)}"}
 
+    @fetch_context()
     def get_developer_analysis(self, username: str, repo_name: str) -> Dict[str, Any]:
         """Get developer-focused analysis."""
         analysis = self.get_full_analysis(username, repo_name)
@@ -122,25 +342,33 @@ class AnalysisService:
         
         return analysis
 
+    @fetch_context()
     def generate_readme(self, username: str, repo_name: str) -> Dict[str, Any]:
         """Generate a comprehensive README file."""
         try:
-            # 1. Get basic repository data
-            repo_data = self.github_service.get_repository(username, repo_name)
+            # 1. Fetch repository data, README, contents and statistics together
+            fetched = self._fetch_repository_data(
+                username, repo_name,
+                ['repository', 'readme', 'contents', 'contributors', 'commit_activity', 'issues', 'head_commit']
+            )
+            repo_data = fetched['repository']
             if not repo_data:
                 return {'error': 'Failed to fetch repository data'}
 
             # 2. Get existing README content
-            existing_readme = self.github_service.get_readme(username, repo_name)
+            existing_readme = fetched['readme']
             
             # 3. Get repository contents for analysis
-            contents = self.github_service.get_repository_contents(username, repo_name)
+            contents = fetched['contents']
             
-            # 4. Analyze all code files
-            code_analysis = self._analyze_code_files(username, repo_name, contents)
+            # 4. Analyze all code files at the commit they were listed at
+            code_analysis = self._analyze_code_files(username, repo_name, contents,
+                                                     commit_sha=fetched['head_commit'])
             
             # 5. Get repository statistics
-            stats = self._get_repository_stats(username, repo_name)
+            stats = self._build_repository_stats(
+                repo_data, fetched['contributors'], fetched['commit_activity'], fetched['issues']
+            )
             
             # 6. Generate comprehensive README
             readme_content = self.gemini_service.generate_readme(
@@ -163,17 +391,86 @@ class AnalysisService:
             print(f"Error in generate_readme: {str(e)}")
             return {'error': str(e)}
 
-    def _analyze_code_files(self, username: str, repo_name: str, contents: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Analyze all code files in the repository."""
+    def _load_snapshot(self, username: str, repo_name: str, commit_sha: str) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Load the file listing and per-file results stored for a previously analyzed commit."""
+        if not self.blob_cache:
+            return None
+        return self.blob_cache.get_snapshot(username, repo_name, commit_sha, FILE_ANALYSIS_VERSION)
+
+    def _apply_commit_diff(self, username: str, repo_name: str, previous: Dict[str, Dict[str, Any]],
+                           base_sha: str, head_sha: Optional[str]) -> Optional[List[Dict[str, Any]]]:
+        """Build the file listing at head_sha from a stored snapshot and the compare endpoint.
+
+        Unchanged files keep the size stored in the snapshot; sizes of added
+        and modified files are looked up at head_sha. Returns None when the
+        diff cannot be trusted (unknown head, base not an ancestor of head,
+        or a file list truncated by GitHub).
+        """
+        if not head_sha:
+            return None
+        if head_sha == base_sha:
+            files = {path: (entry.get('sha'), entry.get('size')) for path, entry in previous.items()}
+        else:
+            comparison = self.github_service.compare_commits(username, repo_name, base_sha, head_sha)
+            if not isinstance(comparison, dict) or comparison.get('status') not in ('ahead', 'identical'):
+                return None
+            changed = comparison.get('files', [])
+            # GitHub lists at most 300 changed files per comparison
+            if len(changed) >= 300:
+                return None
+
+            files = {path: (entry.get('sha'), entry.get('size')) for path, entry in previous.items()}
+            for change in changed:
+                status = change.get('status')
+                filename = change.get('filename')
+                if status == 'removed':
+                    files.pop(filename, None)
+                elif status == 'renamed':
+                    files.pop(change.get('previous_filename'), None)
+                    files[filename] = (change.get('sha'), None)
+                elif status != 'unchanged':
+                    files[filename] = (change.get('sha'), None)
+
+            # The compare endpoint reports no sizes, which the path filter and budget need
+            unsized = [path for path, (_, size) in files.items() if size is None]
+            sizes = self.github_service.get_blob_sizes(username, repo_name, head_sha, unsized)
+            for path in unsized:
+                files[path] = (files[path][0], sizes.get(path))
+
+        # Sorting by path reproduces the order of the Git Trees listing
+        return [
+            {'type': 'file', 'name': path.rsplit('/', 1)[-1], 'path': path, 'sha': sha, 'size': size}
+            for path, (sha, size) in sorted(files.items())
+        ]
+
+    def _analyze_code_files(self, username: str, repo_name: str, contents: List[Dict[str, Any]],
+                            previous: Optional[Dict[str, Dict[str, Any]]] = None,
+                            commit_sha: Optional[str] = None) -> Dict[str, Any]:
+        """Analyze all code files in the repository.
+
+        previous maps paths to {'sha', 'size', 'result'} from an earlier
+        snapshot; files whose blob SHA is unchanged reuse that result. Files
+        a budgeted run did not get to, and files the path filter skipped,
+        have no 'result'; they go through the filter and the budget again.
+        When commit_sha is given, contents are read at that commit and the
+        listing and per-file results are stored as its snapshot.
+
+        With a budget configured, only a prioritized sample of the files
+        that still need fetching is analyzed; 'sampling' then describes the
+        sample and 'languages' holds extrapolated counts.
+        """
         analysis = {
             'total_files': 0,
             'languages': {},
             'dependencies': set(),
+            'manifests': {},
             'main_files': [],
             'architecture': [],
             'complexity': {},
             'total_code': 0,
             'most_used_language': None,
+            'sampling': None,
+            'skipped': {},
             'ai_analysis': {
                 'complexity': 'Unknown',
                 'important_languages': [],
@@ -187,6 +484,7 @@ class AnalysisService:
             print(f"AnalysisService._analyze_code_files: contents is not a list: {type(contents)}")
             return analysis
             
+        files = []
         for item in contents:
             # FIXED: Add type checking for each item
             if not isinstance(item, dict):
@@ -195,30 +493,96 @@ class AnalysisService:
                 
             if item.get('type') == 'file':
                 analysis['total_files'] += 1
-                
-                # Get file content
-                content = self.github_service.get_file_content(username, repo_name, item.get('path', ''))
-                if content:
-                    # Detect language
-                    lang = self._detect_language(item.get('path', ''), content)
-                    if lang:
-                        analysis['languages'][lang] = analysis['languages'].get(lang, 0) + 1
-                    
-                    # Detect dependencies
-                    deps = self._detect_dependencies(content, lang)
-                    analysis['dependencies'].update(deps)
-                    
-                    # Detect main files
-                    if self._is_main_file(item.get('path', ''), content):
-                        analysis['main_files'].append(item.get('path', ''))
-                    
-                    # Detect architecture patterns
-                    patterns = self._detect_architecture_patterns(content, lang)
-                    analysis['architecture'].extend(patterns)
-                    
-                    # Calculate complexity
-                    analysis['complexity'][item.get('path', '')] = self._calculate_complexity(content, lang)
-        
+                files.append(item)
+
+        # Vendored, generated, oversized and binary files are never fetched
+        listed = files
+        files, analysis['skipped'] = self._filter_files(username, repo_name, listed, commit_sha)
+
+        # Reuse results for blobs analyzed before; only new or changed files are fetched
+        results = {}
+        pending = []
+        for item in files:
+            prior = previous.get(item.get('path', '')) if previous else None
+            if prior and 'result' in prior and item.get('sha') and prior.get('sha') == item.get('sha'):
+                results[item.get('path', '')] = prior.get('result')
+                continue
+            if self.blob_cache and item.get('sha'):
+                found, cached = self.blob_cache.get_analysis(item['sha'], item.get('path', ''), FILE_ANALYSIS_VERSION)
+                if found:
+                    results[item.get('path', '')] = cached
+                    continue
+            pending.append(item)
+
+        # Cached results are free; the budget only limits what still has to be fetched
+        strata = None
+        stopped_by = []
+        deadline = None
+        if self.budget.enabled and pending:
+            strata = {item.get('path', ''): stratum_of(item.get('path', ''), is_manifest) for item in files}
+            pending, stopped_by = self.budget.plan(pending, strata)
+            deadline = self.budget.deadline()
+        # A tarball of the whole repository defeats the point of sampling it, and
+        # arrives in archive order rather than priority order
+        use_archive = strata is None or not (stopped_by or deadline)
+
+        # Contents may arrive in any order, so per-file results are keyed by path
+        analyzed = self._analyze_contents(
+            self._iter_file_contents(username, repo_name, pending, use_archive, commit_sha, listed), len(pending)
+        )
+        # Files whose fetch failed; their result is not kept for later runs
+        failed = set()
+        try:
+            for item, path, content, result in analyzed:
+                results[path] = result
+                # A missing content is only cached when it is deterministic, not a failed fetch
+                if content is None and not self.github_service._is_binary_file(path):
+                    failed.add(path)
+                elif self.blob_cache and item.get('sha'):
+                    self.blob_cache.put_analysis(item['sha'], path, FILE_ANALYSIS_VERSION, results[path])
+                if deadline is not None and time.monotonic() > deadline:
+                    stopped_by.append('max_seconds')
+                    break
+        finally:
+            analyzed.close()
+
+        if self.blob_cache and commit_sha:
+            # Skipped files and files left out of a sample are stored too, so an
+            # incremental run sees the whole listing, filters it again and
+            # extrapolates instead of taking the sample for it
+            snapshot = {}
+            for item in listed:
+                path = item.get('path', '')
+                snapshot[path] = {'sha': item.get('sha'), 'size': item.get('size')}
+                if path in results and path not in failed:
+                    snapshot[path]['result'] = results[path]
+            self.blob_cache.put_snapshot(username, repo_name, commit_sha, FILE_ANALYSIS_VERSION, snapshot)
+
+        # Fold the per-file results in listing order
+        for item in files:
+            path = item.get('path', '')
+            result = results.get(path)
+            if not result:
+                continue
+
+            lang = result['language']
+            if lang:
+                analysis['languages'][lang] = analysis['languages'].get(lang, 0) + 1
+            analysis['dependencies'].update(result['dependencies'])
+            if result.get('manifest'):
+                analysis['manifests'][path] = result['manifest']
+            if result['main_file']:
+                analysis['main_files'].append(path)
+            analysis['architecture'].extend(result['architecture'])
+            analysis['complexity'][path] = result['complexity']
+        
+        if strata is not None and len(results) < len(files):
+            sampling = extrapolate(files, results, strata)
+            sampling['stopped_by'] = stopped_by
+            sampling['observed_languages'] = analysis['languages']
+            analysis['sampling'] = sampling
+            analysis['languages'] = sampling['estimated_languages']
+
         # Calculate total code and most used language
         if analysis['languages']:
             analysis['total_code'] = sum(analysis['languages'].values())
@@ -236,99 +600,63 @@ class AnalysisService:
         analysis['dependencies'] = list(analysis['dependencies'])
         return analysis
 
-    def _detect_language(self, filename: str, content: str) -> Optional[str]:
-        """Detect programming language from file extension and content."""
-        if not filename:
-            return None
-            
-        ext = filename.split('.')[-1].lower()
-        lang_map = {
-            'py': 'Python',
-            'js': 'JavaScript',
-            'ts': 'TypeScript',
-            'java': 'Java',
-            'cpp': 'C++',
-            'c': 'C',
-            'go': 'Go',
-            'rb': 'Ruby',
-            'php': 'PHP',
-            'swift': 'Swift',
-            'kt': 'Kotlin',
-            'rs': 'Rust',
-            'md': 'Markdown',
-            'html': 'HTML',
-            'css': 'CSS',
-            'json': 'JSON',
-            'yml': 'YAML',
-            'yaml': 'YAML',
-            'xml': 'XML',
-            'sh': 'Shell',
-            'ipynb': 'Jupyter Notebook'
-        }
-        return lang_map.get(ext)
-
-    def _detect_dependencies(self, content: str, lang: Optional[str]) -> Set[str]:
-        """Detect dependencies from file content."""
-        deps = set()
-        if lang == 'Python':
-            # Look for import statements
-            import_patterns = [
-                r'import\s+([a-zA-Z0-9_]+)',
-                r'from\s+([a-zA-Z0-9_.]+)\s+import',
-                r'pip\s+install\s+([a-zA-Z0-9_\-]+)',
-                r'requirements\.txt.*?([a-zA-Z0-9_\-]+)'
-            ]
-            for pattern in import_patterns:
-                matches = re.finditer(pattern, content)
-                for match in matches:
-                    deps.add(match.group(1))
-        return deps
-
-    def _is_main_file(self, filename: str, content: str) -> bool:
-        """Determine if a file is a main file based on its name and content."""
-        main_indicators = [
-            'main', 'app', 'index', 'server', 'init',
-            'if __name__ == "__main__"',
-            'def main()',
-            'public static void main'
-        ]
-        return any(indicator in filename.lower() or indicator in content for indicator in main_indicators)
-
-    def _detect_architecture_patterns(self, content: str, lang: Optional[str]) -> List[str]:
-        """Detect architecture patterns in the code."""
-        patterns = []
-        if lang == 'Python':
-            if 'class' in content:
-                patterns.append('Object-Oriented')
-            if 'def' in content and 'class' not in content:
-                patterns.append('Functional')
-            if 'async' in content or 'await' in content:
-                patterns.append('Asynchronous')
-            if 'flask' in content.lower():
-                patterns.append('Web Application')
-            if 'tensorflow' in content.lower() or 'torch' in content.lower():
-                patterns.append('Machine Learning')
-        return patterns
-
-    def _calculate_complexity(self, content: str, lang: Optional[str]) -> Dict[str, int]:
-        """Calculate code complexity metrics."""
-        complexity = {
-            'lines': len(content.splitlines()),
-            'functions': len(re.findall(r'def\s+\w+', content)) if lang == 'Python' else 0,
-            'classes': len(re.findall(r'class\s+\w+', content)) if lang == 'Python' else 0
-        }
-        return complexity
+    def _filter_files(self, username: str, repo_name: str, files: List[Dict[str, Any]],
+                      ref: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+        """Drop files not worth fetching, judged by path and listed size.
+
+        Returns the files to analyze and the number skipped per reason.
+        Only the repository's .gitattributes files are fetched to decide.
+        """
+        path_filter = PathFilter(self.ignore_globs, self.max_file_bytes, self.github_service._is_binary_file)
+        if self.honor_gitattributes:
+            attributes = [item for item in files if item.get('path', '').rsplit('/', 1)[-1] == '.gitattributes']
+            for item, content in self._iter_file_contents(username, repo_name, attributes, use_archive=False, ref=ref):
+                if content:
+                    path_filter.add_gitattributes(item.get('path', ''), content)
+
+        kept = []
+        skipped: Dict[str, int] = {}
+        for item in files:
+            reason = path_filter.skip_reason(item)
+            if reason is None:
+                kept.append(item)
+            else:
+                skipped[reason] = skipped.get(reason, 0) + 1
+        return kept, skipped
+
+    def _analyze_contents(self, stream: Iterable[Tuple[Dict[str, Any], Optional[str]]],
+                          count: int) -> Iterator[Tuple[Dict[str, Any], str, Optional[str], Optional[Dict[str, Any]]]]:
+        """Analyze (item, content) pairs as they arrive, yielding (item, path, content, result).
+
+        Large batches are sharded across worker processes; the per-file
+        results are the same either way.
+        """
+        files = ((item, item.get('path', ''), content) for item, content in stream)
+        if self.process_workers > 1 and count >= self.process_min_files:
+            yield from ParallelFileAnalyzer(self.process_workers).analyze(files)
+            return
+        for item, path, content in files:
+            yield item, path, content, file_analyzer.analyze_file(path, content)
 
     def _get_repository_stats(self, username: str, repo_name: str) -> Dict[str, Any]:
         """Get comprehensive repository statistics."""
-        repo_data = self.github_service.get_repository(username, repo_name)
+        fetched = self._fetch_repository_data(
+            username, repo_name, ['repository', 'contributors', 'commit_activity', 'issues']
+        )
+        return self._build_repository_stats(
+            fetched['repository'], fetched['contributors'], fetched['commit_activity'], fetched['issues']
+        )
+
+    def _build_repository_stats(self, repo_data: Any, contributors: Any, commit_activity: Any,
+                                issues: Any) -> Dict[str, Any]:
+        """Assemble repository statistics from already-fetched GitHub data."""
         if not isinstance(repo_data, dict):
             repo_data = {}
-            
+
         return {
-            'contributors': self.github_service.get_contributors(username, repo_name),
-            'commit_activity': self.github_service.get_commit_activity(username, repo_name),
-            'issues': self.github_service.get_issues(username, repo_name),
+            'contributors': contributors if isinstance(contributors, list) else [],
+            'commit_activity': commit_activity if commit_activity is not None else [],
+            'issues': issues if isinstance(issues, list) else [],
             'metrics': {
                 'stars': repo_data.get('stargazers_count', 0),
                 'forks': repo_data.get('forks_count', 0),
@@ -336,27 +664,35 @@ class AnalysisService:
             }
         }
 
+    @fetch_context()
     def get_code_feedback(self, username: str, repo_name: str) -> Dict[str, Any]:
         """Get code quality feedback."""
         try:
-            # Get repository data
-            repo_data = self.github_service.get_repository(username, repo_name)
+            # Fetch repository data, contents, README and statistics together
+            fetched = self._fetch_repository_data(
+                username, repo_name,
+                ['repository', 'contents', 'readme', 'contributors', 'commit_activity', 'issues', 'head_commit']
+            )
+            repo_data = fetched['repository']
             if not repo_data:
                 return {'error': 'Failed to fetch repository data'}
 
             # Get repository contents
-            contents = self.github_service.get_repository_contents(username, repo_name)
+            contents = fetched['contents']
             if not contents:
                 return {'error': 'Failed to fetch repository contents'}
 
             # Get README content
-            readme_content = self.github_service.get_readme(username, repo_name)
+            readme_content = fetched['readme']
 
-            # Analyze code files
-            code_analysis = self._analyze_code_files(username, repo_name, contents)
+            # Analyze code files at the commit they were listed at
+            code_analysis = self._analyze_code_files(username, repo_name, contents,
+                                                     commit_sha=fetched['head_commit'])
             
             # Get repository statistics
-            stats = self._get_repository_stats(username, repo_name)
+            stats = self._build_repository_stats(
+                repo_data, fetched['contributors'], fetched['commit_activity'], fetched['issues']
+            )
             
             # Calculate code quality metrics
             quality_metrics = self._analyze_code_quality(code_analysis)
@@ -527,39 +863,32 @@ class AnalysisService:
         return suggestions
 
     def _calculate_metrics(self, repo_data: Dict, contributors: List[Dict], issues: List[Dict], 
-                         activity_data: Dict) -> Dict[str, Any]:
-        """Calculate repository metrics."""
+                         activity_data: Dict, contributor_metrics: Optional[ContributorMetrics] = None,
+                         issue_metrics: Optional[IssueMetrics] = None) -> Dict[str, Any]:
+        """Calculate repository metrics.
+
+        Accumulators filled while the lists were streamed take precedence,
+        since they also cover items beyond the kept lists.
+        """
         # Ensure repo_data is a dict
         if not isinstance(repo_data, dict):
             repo_data = {}
             
-        # Ensure contributors is a list
-        if not isinstance(contributors, list):
-            contributors = []
-            
-        # Ensure issues is a list
-        if not isinstance(issues, list):
-            issues = []
-        
-        avg_contributions = sum(contrib.get('contributions', 0) for contrib in contributors) / len(contributors) if contributors else 0
-        active_contributors = sum(1 for contrib in contributors if contrib.get('contributions', 0) > 10) if contributors else 0
-        open_issues = len([issue for issue in issues if isinstance(issue, dict) and issue.get('state') == 'open'])
-        
-        # Calculate issue response time
-        issue_response_time = 7  # Default value
-        if issues:
-            try:
-                issue_dates = pd.to_datetime([issue.get('created_at') for issue in issues if isinstance(issue, dict) and issue.get('created_at')])
-                current_time = pd.Timestamp.now(tz='UTC')
-                issue_response_time = int((current_time - issue_dates).mean().days)
-            except:
-                issue_response_time = 7
+        if contributor_metrics is None:
+            contributor_metrics = ContributorMetrics()
+            for contrib in contributors if isinstance(contributors, list) else []:
+                contributor_metrics.add(contrib)
+
+        if issue_metrics is None:
+            issue_metrics = IssueMetrics()
+            for issue in issues if isinstance(issues, list) else []:
+                issue_metrics.add(issue)
         
         return {
-            'avg_contributions': round(avg_contributions, 2),
-            'active_contributors': active_contributors,
-            'open_issues': open_issues,
-            'issue_response_time': issue_response_time,
+            'avg_contributions': round(contributor_metrics.avg_contributions, 2),
+            'active_contributors': contributor_metrics.active_contributors,
+            'open_issues': issue_metrics.open_issues,
+            'issue_response_time': issue_metrics.issue_response_time,
             'total_code': 0  # Will be updated by code analysis
         }
 
@@ -0,0 +1,37 @@
+import tarfile
+from typing import BinaryIO, Iterator, Optional, Set, Tuple
+
+
+class ArchiveContentSource:
+    """Stream regular files out of a tar archive without extracting it to disk.
+
+    The archive is read sequentially from any file-like object (an HTTP
+    response body, a pipe or a local tarball), so members are handed to
+    the caller one at a time and never written out.
+    """
+
+    def __init__(self, fileobj: BinaryIO, strip_components: int = 1):
+        self.fileobj = fileobj
+        # GitHub tarballs wrap everything in a '<owner>-<repo>-<sha>/' directory
+        self.strip_components = strip_components
+
+    def _relative_path(self, name: str) -> Optional[str]:
+        """Strip the leading directory components from an archive member name."""
+        parts = name.split('/', self.strip_components)
+        if len(parts) <= self.strip_components:
+            return None
+        return parts[self.strip_components] or None
+
+    def iter_files(self, paths: Optional[Set[str]] = None) -> Iterator[Tuple[str, bytes]]:
+        """Yield (path, raw bytes) for each regular file, optionally limited to paths."""
+        with tarfile.open(fileobj=self.fileobj, mode='r|*') as archive:
+            for member in archive:
+                if not member.isfile():
+                    continue
+                path = self._relative_path(member.name)
+                if path is None or (paths is not None and path not in paths):
+                    continue
+                extracted = archive.extractfile(member)
+                if extracted is None:
+                    continue
+                yield path, extracted.read()
@@ -0,0 +1,102 @@
+import subprocess
+import threading
+from typing import IO, Iterable, Iterator, List, Optional, Tuple
+
+
+class GitBlobReader:
+    """Read many objects from one repository through a long-lived `git cat-file --batch`.
+
+    Object names ("<sha>" or "<rev>:<path>") are written to the process by a
+    background thread while responses are read back, so thousands of blobs
+    stream through one pipe pair without a subprocess per file. One batch
+    runs at a time; concurrent callers wait for the pipe.
+    """
+
+    def __init__(self, repo_path: str):
+        self.repo_path = repo_path
+        self._process: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+
+    def _ensure_process(self) -> subprocess.Popen:
+        if self._process is None or self._process.poll() is not None:
+            self._process = subprocess.Popen(
+                ['git', 'cat-file', '--batch'], cwd=self.repo_path,
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+            )
+        return self._process
+
+    @staticmethod
+    def _feed(stdin: IO[bytes], names: List[str]) -> None:
+        try:
+            stdin.write(b''.join(name.encode('utf-8', 'surrogateescape') + b'\n' for name in names))
+            stdin.flush()
+        except (BrokenPipeError, ValueError):
+            # The reader side notices the dead process and fails the batch
+            pass
+
+    @staticmethod
+    def _read_response(stdout: IO[bytes]) -> Optional[bytes]:
+        header = stdout.readline()
+        if not header:
+            raise OSError('git cat-file --batch exited unexpectedly')
+        # "<name> missing" / "<name> ambiguous"; names may contain spaces
+        if header.endswith((b' missing\n', b' ambiguous\n')):
+            return None
+        size = int(header.split()[2])
+        data = stdout.read(size)
+        stdout.read(1)  # Trailing newline after the content
+        return data
+
+    def read_many(self, names: Iterable[str]) -> Iterator[Tuple[str, Optional[bytes]]]:
+        """Yield (name, content) in request order; content is None for missing objects."""
+        names = list(names)
+        if not names:
+            return
+        with self._lock:
+            process = self._ensure_process()
+            writer = threading.Thread(target=self._feed, args=(process.stdin, names), daemon=True)
+            writer.start()
+            completed = False
+            try:
+                for name in names:
+                    yield name, self._read_response(process.stdout)
+                completed = True
+            finally:
+                if not completed:
+                    # Unread responses would desynchronize the pipe; start over next time
+                    process.kill()
+                writer.join()
+                if not completed:
+                    self._stop()
+
+    def read(self, name: str) -> Optional[bytes]:
+        """Return the content of one object, or None if it does not exist."""
+        for _, data in self.read_many([name]):
+            return data
+        return None
+
+    def _stop(self) -> None:
+        process, self._process = self._process, None
+        if process is None:
+            return
+        try:
+            process.stdin.close()
+        except OSError:
+            pass
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+
+    def close(self) -> None:
+        """Stop the cat-file process; a later read starts a new one."""
+        with self._lock:
+            self._stop()
+
+    def __enter__(self) -> 'GitBlobReader':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,104 @@
+import re
+from typing import Any, Dict, List, Optional, Pattern, Tuple
+
+# Substrings that mark a main file, in the file name or anywhere in the content.
+# The longer indicators the detectors used to list ('def main()',
+# 'if __name__ == "__main__"', ...) all contain 'main', so they add nothing.
+MAIN_INDICATORS = ('main', 'app', 'index', 'server', 'init')
+
+
+class LanguageRules:
+    """Precompiled detectors for one language.
+
+    Every pattern is paired with a literal it cannot match without, so the
+    regex only runs over content that contains that literal. Substring
+    tests run at memory speed while a regex scan is an order of magnitude
+    slower, which makes this cheaper than one combined pattern.
+    """
+
+    def __init__(self, dependencies: List[Tuple[str, str]], function: Optional[Tuple[str, str]] = None,
+                 klass: Optional[Tuple[str, str]] = None,
+                 architecture: Optional[Dict[str, Tuple[str, ...]]] = None):
+        self.dependencies: List[Tuple[str, Pattern]] = [
+            (literal, re.compile(pattern)) for literal, pattern in dependencies
+        ]
+        self.function = (function[0], re.compile(function[1])) if function else None
+        self.klass = (klass[0], re.compile(klass[1])) if klass else None
+        # Tag -> lower-case keywords; any of them in the lower-cased content adds the tag
+        self.architecture = architecture or {}
+
+
+LANGUAGE_RULES: Dict[str, LanguageRules] = {
+    'Python': LanguageRules(
+        dependencies=[
+            ('import', r'import\s+([a-zA-Z0-9_]+)'),
+            ('from', r'from\s+([a-zA-Z0-9_.]+)\s+import'),
+            ('pip', r'pip\s+install\s+([a-zA-Z0-9_\-]+)'),
+            ('requirements.txt', r'requirements\.txt.*?([a-zA-Z0-9_\-]+)')
+        ],
+        function=('def', r'def\s+\w+'),
+        klass=('class', r'class\s+\w+'),
+        architecture={
+            'Web Application': ('flask',),
+            'Machine Learning': ('tensorflow', 'torch')
+        }
+    ),
+}
+
+_OTHER_LINE_BREAKS = ('\r', '\x0b', '\x0c', '\x1c', '\x1d', '\x1e')
+
+
+def count_lines(content: str) -> int:
+    """Same as len(content.splitlines()) without building the list."""
+    if content.isascii() and not any(brk in content for brk in _OTHER_LINE_BREAKS):
+        return content.count('\n') + (0 if not content or content.endswith('\n') else 1)
+    return len(content.splitlines())
+
+
+def _count(rule: Optional[Tuple[str, Pattern]], content: str) -> Tuple[bool, int]:
+    """Whether content has the rule's literal, and how often the pattern matches."""
+    if rule is None:
+        return False, 0
+    literal, pattern = rule
+    if literal not in content:
+        return False, 0
+    return True, len(pattern.findall(content))
+
+
+def scan_file(path: str, content: str, lang: Optional[str]) -> Dict[str, Any]:
+    """Run every per-file detector over content with lang's precompiled rules.
+
+    Returns the dependencies (a set), main-file flag, architecture tags
+    and line/function/class counts; the same values the separate
+    detectors in services.file_analyzer compute.
+    """
+    name = path.lower()
+    main_file = any(indicator in name or indicator in content for indicator in MAIN_INDICATORS)
+    complexity = {'lines': count_lines(content), 'functions': 0, 'classes': 0}
+    rules = LANGUAGE_RULES.get(lang)
+    if rules is None:
+        return {'dependencies': set(), 'main_file': main_file, 'architecture': [], 'complexity': complexity}
+
+    deps = set()
+    for literal, pattern in rules.dependencies:
+        if literal in content:
+            deps.update(pattern.findall(content))
+
+    # The keyword test doubles as the architecture flag and the counter's prefilter
+    has_def, complexity['functions'] = _count(rules.function, content)
+    has_class, complexity['classes'] = _count(rules.klass, content)
+
+    architecture = []
+    if has_class:
+        architecture.append('Object-Oriented')
+    if has_def and not has_class:
+        architecture.append('Functional')
+    if 'async' in content or 'await' in content:
+        architecture.append('Asynchronous')
+    if rules.architecture:
+        lowered = content.lower()
+        for tag, keywords in rules.architecture.items():
+            if any(keyword in lowered for keyword in keywords):
+                architecture.append(tag)
+
+    return {'dependencies': deps, 'main_file': main_file, 'architecture': architecture, 'complexity': complexity}
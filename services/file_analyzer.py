@@ -0,0 +1,217 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from services.code_scanner import scan_file
+from services.manifest_parsers import parse_manifest
+from services.python_analyzer import analyze_python, architecture_tags, estimate_complexity
+
+# Per-file detectors. They are plain module-level functions so worker
+# processes can run them without pickling an AnalysisService. analyze_file
+# gets its results from services.code_scanner in a single call, and
+# analyzes Python with services.python_analyzer when it parses.
+
+# Python files over this size or parse time fall back to the scanner's regexes
+PYTHON_AST_MAX_BYTES = int(os.getenv('ANALYSIS_PYTHON_AST_MAX_BYTES', str(1024 * 1024)))
+PYTHON_AST_MAX_SECONDS = float(os.getenv('ANALYSIS_PYTHON_AST_MAX_SECONDS', '1'))
+
+# How worker processes are started; forkserver does not fork a server's threads and held locks
+PROCESS_START_METHOD = os.getenv('ANALYSIS_PROCESS_START_METHOD', 'forkserver')
+
+LANG_MAP = {
+    'py': 'Python',
+    'js': 'JavaScript',
+    'ts': 'TypeScript',
+    'java': 'Java',
+    'cpp': 'C++',
+    'c': 'C',
+    'go': 'Go',
+    'rb': 'Ruby',
+    'php': 'PHP',
+    'swift': 'Swift',
+    'kt': 'Kotlin',
+    'rs': 'Rust',
+    'md': 'Markdown',
+    'html': 'HTML',
+    'css': 'CSS',
+    'json': 'JSON',
+    'yml': 'YAML',
+    'yaml': 'YAML',
+    'xml': 'XML',
+    'sh': 'Shell',
+    'ipynb': 'Jupyter Notebook'
+}
+
+
+def detect_language(filename: str, content: str) -> Optional[str]:
+    """Detect programming language from file extension and content."""
+    if not filename:
+        return None
+
+    ext = filename.split('.')[-1].lower()
+    return LANG_MAP.get(ext)
+
+
+def analyze_file(path: str, content: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Run every per-file detector over one file's content."""
+    if not content:
+        return None
+
+    result = _analyze_source(path, content)
+    # Dependency manifests (requirements.txt, package.json, ...) declare the real dependencies
+    manifest = parse_manifest(path, content)
+    if manifest is not None:
+        result['manifest'] = manifest
+        result['dependencies'] = sorted(set(result['dependencies']) | set(manifest['dependencies']))
+    return result
+
+
+def _analyze_source(path: str, content: str) -> Dict[str, Any]:
+    """Language, imports, main-file flag, architecture and complexity of one file."""
+    # Detect language
+    lang = detect_language(path, content)
+    facts = analyze_python(content, PYTHON_AST_MAX_BYTES, PYTHON_AST_MAX_SECONDS) if lang == 'Python' else None
+    if facts is not None:
+        # Only the main-file flag and line count are still taken from the scanner
+        scan = scan_file(path, content, None)
+        complexity = {
+            'lines': scan['complexity']['lines'],
+            'functions': facts['functions'],
+            'classes': facts['classes'],
+            'cyclomatic': facts['cyclomatic'],
+            'max_cyclomatic': facts['max_cyclomatic']
+        }
+        return {
+            'language': lang,
+            'dependencies': sorted(facts['dependencies']),
+            'main_file': scan['main_file'],
+            'architecture': architecture_tags(facts),
+            'complexity': complexity,
+            'parser': 'ast'
+        }
+
+    # Dependencies, main file, architecture and complexity in one scan
+    scan = scan_file(path, content, lang)
+    result = {
+        'language': lang,
+        'dependencies': sorted(scan['dependencies']),
+        'main_file': scan['main_file'],
+        'architecture': scan['architecture'],
+        'complexity': scan['complexity']
+    }
+    if lang == 'Python':
+        # Too large, too slow or not parseable (e.g. Python 2)
+        result['complexity'].update(estimate_complexity(content))
+        result['parser'] = 'regex'
+    return result
+
+
+def analyze_shard(files: List[Tuple[str, str]]) -> List[Optional[Dict[str, Any]]]:
+    """Analyze a shard of (path, content) pairs in a worker process."""
+    return [analyze_file(path, content) for path, content in files]
+
+
+_pools: Dict[int, ProcessPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+
+def shared_process_pool(workers: int) -> ProcessPoolExecutor:
+    """Return the process-wide analysis pool with the given number of workers.
+
+    The pool is kept for the life of the process so workers are started
+    once, not per analysis, until it breaks and is discarded.
+    """
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            # Platforms without the configured start method use their default
+            context = None
+            if PROCESS_START_METHOD in multiprocessing.get_all_start_methods():
+                context = multiprocessing.get_context(PROCESS_START_METHOD)
+                if PROCESS_START_METHOD == 'forkserver':
+                    # The server only needs the detectors, not the application's __main__
+                    context.set_forkserver_preload(['services.file_analyzer'])
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+            _pools[workers] = pool
+        return pool
+
+
+def _discard_pool(workers: int, pool: ProcessPoolExecutor) -> None:
+    """Forget a broken pool so the next analysis starts a fresh one."""
+    with _pools_lock:
+        if _pools.get(workers) is pool:
+            del _pools[workers]
+    pool.shutdown(wait=False)
+
+
+class ParallelFileAnalyzer:
+    """Shard per-file analysis across worker processes.
+
+    Files are grouped into shards of about shard_bytes of content and
+    analyzed while later contents are still being fetched. Each file gets
+    exactly the result analyze_file would give it in-process. If a worker
+    dies, the pool is discarded and the remaining shards are analyzed in
+    this process.
+    """
+
+    def __init__(self, workers: int, shard_bytes: int = 1024 * 1024, shard_files: int = 256):
+        self.workers = workers
+        self.shard_bytes = shard_bytes
+        self.shard_files = shard_files
+
+    def analyze(self, files: Iterable[Tuple[Any, str, Optional[str]]]) -> Iterator[Tuple[Any, str, Optional[str], Optional[Dict[str, Any]]]]:
+        """Yield (key, path, content, result) for each (key, path, content), in no particular order."""
+        pool: Optional[ProcessPoolExecutor] = shared_process_pool(self.workers)
+        pending: List[Tuple[Future, List[Tuple[Any, str, Optional[str]]]]] = []
+        shard: List[Tuple[Any, str, Optional[str]]] = []
+        shard_size = 0
+
+        def give_up_pool() -> None:
+            nonlocal pool
+            if pool is not None:
+                _discard_pool(self.workers, pool)
+                pool = None
+
+        def submit() -> None:
+            work = [(path, content) for _, path, content in shard]
+            future = None
+            if pool is not None:
+                try:
+                    future = pool.submit(analyze_shard, work)
+                except BrokenProcessPool:
+                    give_up_pool()
+            if future is None:
+                future = Future()
+                future.set_result(analyze_shard(work))
+            pending.append((future, shard))
+
+        def shard_results(future: Future, done: List[Tuple[Any, str, Optional[str]]]) -> List[Optional[Dict[str, Any]]]:
+            try:
+                return future.result()
+            except BrokenProcessPool:
+                # A worker was killed (e.g. out of memory); redo its shard here
+                give_up_pool()
+                return analyze_shard([(path, content) for _, path, content in done])
+
+        for key, path, content in files:
+            if not content:
+                # Nothing to analyze; no need to ship it to a worker
+                yield key, path, content, None
+                continue
+            shard.append((key, path, content))
+            shard_size += len(content)
+            if shard_size >= self.shard_bytes or len(shard) >= self.shard_files:
+                submit()
+                shard, shard_size = [], 0
+            # Hand back finished shards while the caller keeps fetching
+            while pending and pending[0][0].done():
+                future, done = pending.pop(0)
+                for (key_, path_, content_), result in zip(done, shard_results(future, done)):
+                    yield key_, path_, content_, result
+        if shard:
+            submit()
+        for future, done in pending:
+            for (key_, path_, content_), result in zip(done, shard_results(future, done)):
+                yield key_, path_, content_, result
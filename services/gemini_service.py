@@ -1,8 +1,8 @@
-import requests
 import os
 from typing import Dict, Any, Optional, List
 import json
 import re
+from utils.http_session import shared_session, pool_stats
 
 class GeminiService:
     def __init__(self):
@@ -10,6 +10,12 @@ class GeminiService:
         if not self.api_key:
             raise ValueError("GEMINI_API_KEY environment variable is not set")
         self.api_url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent?key={self.api_key}"
+        # generateContent has no side effects, so POSTs are safe to retry
+        self.session = shared_session('GEMINI', retry_methods=frozenset({'POST'}))
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Connection reuse metrics for the shared Gemini session."""
+        return pool_stats(self.session)
 
     def generate_content(self, prompt: str) -> str:
         """Generate content using Gemini API."""
@@ -29,7 +35,7 @@ class GeminiService:
         }
         
         try:
-            response = requests.post(self.api_url, headers=headers, json=data)
+            response = self.session.post(self.api_url, headers=headers, json=data)
             if response.status_code == 200:
                 result = response.json()
                 if 'candidates' in result and len(result['candidates']) > 0:
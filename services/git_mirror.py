@@ -0,0 +1,257 @@
+import logging
+import os
+import shutil
+import subprocess
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from services.blob_reader import GitBlobReader
+
+logger = logging.getLogger(__name__)
+
+_mirrors: Dict[str, 'GitMirrorCache'] = {}
+_mirrors_lock = threading.Lock()
+
+
+class GitMirrorCache:
+    """Local bare, blobless mirrors of remote repositories for the git fallbacks.
+
+    Each repository is cloned once and brought up to date with `git fetch`
+    on later use. Mirrors unused for longer than max_age seconds, and the
+    least recently used ones beyond max_bytes, are deleted. Eviction walks
+    every mirror, so it runs only after a clone or fetch added data, or at
+    most once per fetch_interval otherwise.
+    """
+
+    # Touched on every use and on every fetch; their mtimes drive eviction and refresh
+    USED_MARKER = 'mirror-used'
+    FETCHED_MARKER = 'mirror-fetched'
+    # Path to blob SHA maps kept for this many commits
+    MAX_CACHED_TREES = 8
+
+    def __init__(self, directory: str, max_bytes: int, max_age: float,
+                 fetch_interval: float, url_template: str):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.fetch_interval = fetch_interval
+        self.url_template = url_template
+        self._lock = threading.Lock()
+        self._repo_locks: Dict[str, threading.RLock] = {}
+        self._readers: Dict[str, GitBlobReader] = {}
+        # (mirror path, commit SHA) -> {file path: blob SHA}; a commit's tree never changes
+        self._trees: 'OrderedDict[Tuple[str, str], Dict[str, str]]' = OrderedDict()
+        self._clones = 0
+        # Set when a clone or fetch may have grown the mirrors past their budget
+        self._grown = False
+        self._evicted_at = 0.0
+        self._fetches = 0
+        self._evictions = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _name(self, owner: str, repo: str) -> str:
+        return f"{owner.lower()}__{repo.lower()}.git"
+
+    def _repo_lock(self, name: str) -> threading.RLock:
+        with self._lock:
+            return self._repo_locks.setdefault(name, threading.RLock())
+
+    def _git(self, args: List[str], cwd: Optional[str] = None, input: Optional[bytes] = None) -> bytes:
+        return subprocess.run(['git'] + args, cwd=cwd, input=input, check=True, capture_output=True).stdout
+
+    @contextmanager
+    def open(self, owner: str, repo: str) -> Iterator[str]:
+        """Yield the path of an up-to-date mirror; it is not evicted while the block runs."""
+        name = self._name(owner, repo)
+        path = os.path.join(self.directory, name)
+        with self._repo_lock(name):
+            if not os.path.isdir(path):
+                self._clone(owner, repo, path)
+            elif time.time() - self._mtime(path, self.FETCHED_MARKER) > self.fetch_interval:
+                try:
+                    self._fetch(path)
+                except subprocess.CalledProcessError as e:
+                    # A stale mirror is still better than no data
+                    logger.warning(f"git fetch failed for {owner}/{repo}: {e.stderr!r}")
+            self._touch(path, self.USED_MARKER)
+            yield path
+        if self._grown or time.time() - self._evicted_at >= self.fetch_interval:
+            self.evict()
+
+    def _fetch(self, path: str) -> None:
+        """Bring a mirror's branches up to date; the caller holds its repository lock."""
+        self._git(['fetch', '--prune', 'origin'], cwd=path)
+        self._touch(path, self.FETCHED_MARKER)
+        self._fetches += 1
+        self._grown = True
+        # A running cat-file may not see the updated refs
+        self._close_reader(os.path.basename(path))
+
+    def ensure_commit(self, path: str, ref: str) -> None:
+        """Fetch now if ref is not in the mirror yet, e.g. a commit pushed since the last fetch.
+
+        Raises subprocess.CalledProcessError if the mirror still lacks it.
+        """
+        try:
+            self._git(['cat-file', '-e', f'{ref}^{{commit}}'], cwd=path)
+            return
+        except subprocess.CalledProcessError:
+            pass
+        with self._repo_lock(os.path.basename(path)):
+            self._fetch(path)
+        self._git(['cat-file', '-e', f'{ref}^{{commit}}'], cwd=path)
+
+    def blob_reader(self, owner: str, repo: str) -> GitBlobReader:
+        """Long-lived blob reader for a mirror; use it inside an open() block."""
+        name = self._name(owner, repo)
+        with self._lock:
+            reader = self._readers.get(name)
+            if reader is None:
+                reader = GitBlobReader(os.path.join(self.directory, name))
+                self._readers[name] = reader
+            return reader
+
+    def _close_reader(self, name: str) -> None:
+        with self._lock:
+            reader = self._readers.pop(name, None)
+        if reader is not None:
+            reader.close()
+
+    def blob_shas(self, path: str, paths: Iterable[str], ref: str = 'HEAD') -> Dict[str, str]:
+        """Map each of paths that exists at ref to its blob SHA.
+
+        The whole tree is listed with one ls-tree call per commit and kept,
+        so reading files one at a time does not list it again.
+        """
+        commit = self._git(['rev-parse', '--verify', f'{ref}^{{commit}}'], cwd=path).decode('ascii').strip()
+        key = (path, commit)
+        with self._lock:
+            tree = self._trees.get(key)
+            if tree is not None:
+                self._trees.move_to_end(key)
+        if tree is None:
+            tree = {}
+            for record in self._git(['ls-tree', '-r', '-z', commit], cwd=path).split(b'\0'):
+                meta, _, file_path = record.partition(b'\t')
+                if meta:
+                    tree[file_path.decode('utf-8', 'surrogateescape')] = meta.split()[2].decode('ascii')
+            with self._lock:
+                self._trees[key] = tree
+                while len(self._trees) > self.MAX_CACHED_TREES:
+                    self._trees.popitem(last=False)
+        return {file_path: tree[file_path] for file_path in paths if file_path in tree}
+
+    def prefetch_blobs(self, path: str, shas: Iterable[str], ref: str = 'HEAD') -> int:
+        """Fetch those of shas (blobs under ref) missing from a blobless mirror in one request.
+
+        Without this, reading each missing blob triggers its own lazy fetch.
+        Returns the number of blobs requested.
+        """
+        shas = set(shas)
+        # Missing objects are printed as '?<sha>' instead of being fetched
+        listing = self._git(['rev-list', '--objects', '--missing=print', f'{ref}^{{tree}}'], cwd=path)
+        missing = [line[1:].decode('ascii') for line in listing.splitlines()
+                   if line.startswith(b'?') and line[1:].decode('ascii') in shas]
+        if missing:
+            try:
+                self._git(['-c', 'fetch.negotiationAlgorithm=noop', 'fetch', '--no-tags',
+                           '--no-write-fetch-head', '--recurse-submodules=no', '--filter=blob:none',
+                           '--stdin', 'origin'], cwd=path, input='\n'.join(missing).encode('ascii') + b'\n')
+                self._grown = True
+            except subprocess.CalledProcessError as e:
+                # Reads still work, one lazy fetch per blob
+                logger.warning(f"Prefetching {len(missing)} blobs into {path} failed: {e.stderr!r}")
+        return len(missing)
+
+    def _clone(self, owner: str, repo: str, path: str) -> None:
+        url = self.url_template.format(owner=owner, repo=repo)
+        tmp_path = f"{path}.tmp-{threading.get_ident()}"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        try:
+            # History and trees only; blobs are fetched lazily when something reads them
+            self._git(['clone', '--bare', '--filter=blob:none', '--quiet', url, tmp_path])
+            # Bare clones have no fetch refspec, so later fetches would not update the branches
+            self._git(['config', 'remote.origin.fetch', '+refs/heads/*:refs/heads/*'], cwd=tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+        self._touch(path, self.FETCHED_MARKER)
+        self._clones += 1
+        self._grown = True
+
+    def _touch(self, path: str, marker: str) -> None:
+        with open(os.path.join(path, marker), 'a'):
+            pass
+        os.utime(os.path.join(path, marker))
+
+    def _mtime(self, path: str, marker: str) -> float:
+        try:
+            return os.path.getmtime(os.path.join(path, marker))
+        except OSError:
+            return 0.0
+
+    def _size(self, path: str) -> int:
+        total = 0
+        for root, _, files in os.walk(path):
+            for name in files:
+                try:
+                    total += os.path.getsize(os.path.join(root, name))
+                except OSError:
+                    continue
+        return total
+
+    def evict(self) -> None:
+        """Delete expired mirrors, then the least recently used ones over the size budget."""
+        self._grown = False
+        self._evicted_at = time.time()
+        mirrors = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.endswith('.git') and os.path.isdir(path):
+                mirrors.append((self._mtime(path, self.USED_MARKER), name, path, self._size(path)))
+        mirrors.sort()
+
+        total = sum(size for _, _, _, size in mirrors)
+        now = time.time()
+        for used, name, path, size in mirrors:
+            if now - used <= self.max_age and total <= self.max_bytes:
+                break
+            lock = self._repo_lock(name)
+            # Mirrors in use by another thread are left alone
+            if not lock.acquire(blocking=False):
+                continue
+            try:
+                self._close_reader(name)
+                shutil.rmtree(path, ignore_errors=True)
+            finally:
+                lock.release()
+            total -= size
+            self._evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        mirrors = [name for name in os.listdir(self.directory) if name.endswith('.git')]
+        return {
+            'mirrors': len(mirrors),
+            'clones': self._clones,
+            'fetches': self._fetches,
+            'evictions': self._evictions
+        }
+
+
+def shared_git_mirror() -> GitMirrorCache:
+    """Return the process-wide mirror cache configured from the environment."""
+    directory = os.getenv('GIT_MIRROR_DIR', os.path.join('.cache', 'git'))
+    with _mirrors_lock:
+        mirror = _mirrors.get(directory)
+        if mirror is None:
+            mirror = GitMirrorCache(
+                directory,
+                max_bytes=int(os.getenv('GIT_MIRROR_MAX_BYTES', str(2 * 1024 * 1024 * 1024))),
+                max_age=float(os.getenv('GIT_MIRROR_MAX_AGE_SECONDS', str(7 * 24 * 3600))),
+                fetch_interval=float(os.getenv('GIT_MIRROR_FETCH_INTERVAL', '300')),
+                url_template=os.getenv('GIT_MIRROR_URL_TEMPLATE', 'https://github.com/{owner}/{repo}.git')
+            )
+            _mirrors[directory] = mirror
+        return mirror
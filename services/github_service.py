@@ -1,82 +1,284 @@
 import requests
 import os
 import base64
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple, Callable, Hashable, Iterable, Iterator
 import json
 import time
 from datetime import datetime, timedelta
 import logging
+import subprocess
+import threading
+import functools
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
 from ratelimit import limits, sleep_and_retry
+from services.archive_source import ArchiveContentSource
+from services.git_mirror import shared_git_mirror
+from utils.http_session import shared_session, pool_stats
+from utils.http_cache import shared_response_cache
+from utils.git_activity import commit_activity_from_git
+from utils.concurrency import submit_with_context
+from utils.credential_pool import Credential, CredentialPool, tokens_from_env
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+class FetchContext:
+    """Request-scoped memo of GitHub fetches shared by every GitHubService instance."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._results: Dict[Hashable, Future] = {}
+
+    def get_or_fetch(self, key: Hashable, fetch: Callable[[], Any]) -> Any:
+        """Return the memoized result for key, fetching it at most once.
+
+        Concurrent callers asking for the same key wait for the first one
+        instead of issuing a duplicate request.
+        """
+        with self._lock:
+            future = self._results.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = Future()
+                self._results[key] = future
+
+        if is_owner:
+            try:
+                future.set_result(fetch())
+            except BaseException as e:
+                # Failures are not memoized so a later caller can retry
+                with self._lock:
+                    self._results.pop(key, None)
+                future.set_exception(e)
+        return future.result()
+
+    def prime(self, key: Hashable, value: Any) -> None:
+        """Record a result obtained some other way, unless key was fetched already."""
+        with self._lock:
+            if key not in self._results:
+                future = Future()
+                future.set_result(value)
+                self._results[key] = future
+
+    def peek(self, key: Hashable) -> Tuple[bool, Any]:
+        """Return (True, result) if key was fetched successfully already, without fetching."""
+        with self._lock:
+            future = self._results.get(key)
+        if future is None or not future.done() or future.exception() is not None:
+            return False, None
+        return True, future.result()
+
+
+_current_fetch_context: ContextVar[Optional[FetchContext]] = ContextVar('github_fetch_context', default=None)
+
+
+@contextmanager
+def fetch_context():
+    """Memoize GitHub fetches for the duration of the block.
+
+    Nested blocks reuse the outer context. Can also be used as a decorator.
+    """
+    if _current_fetch_context.get() is not None:
+        yield _current_fetch_context.get()
+        return
+    context = FetchContext()
+    token = _current_fetch_context.set(context)
+    try:
+        yield context
+    finally:
+        _current_fetch_context.reset(token)
+
+
+def _memo_key(endpoint: str, username: str, repo_name: str, *args, **kwargs) -> Hashable:
+    return (endpoint, username.lower(), repo_name.lower()) + args + tuple(sorted(kwargs.items()))
+
+
+def memoized(endpoint: str):
+    """Fetch (endpoint, owner, repo, *args) at most once per active fetch context."""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, username: str, repo_name: str, *args, **kwargs):
+            context = _current_fetch_context.get()
+            if context is None:
+                return method(self, username, repo_name, *args, **kwargs)
+            key = _memo_key(endpoint, username, repo_name, *args, **kwargs)
+            return context.get_or_fetch(key, lambda: method(self, username, repo_name, *args, **kwargs))
+        return wrapper
+    return decorator
+
+# Aliases let one round-trip cover what the REST API needs several calls for
+REPOSITORY_OVERVIEW_QUERY = """
+query($owner: String!, $name: String!, $issues: Int!) {
+  repository(owner: $owner, name: $name) {
+    name
+    nameWithOwner
+    description
+    url
+    stargazerCount
+    forkCount
+    watchers { totalCount }
+    primaryLanguage { name }
+    createdAt
+    updatedAt
+    pushedAt
+    defaultBranchRef { name target { oid } }
+    openIssueCount: issues(states: OPEN) { totalCount }
+    openPullRequestCount: pullRequests(states: OPEN) { totalCount }
+    openIssues: issues(first: $issues, states: OPEN, orderBy: {field: CREATED_AT, direction: DESC}) {
+      nodes { number title state createdAt url }
+    }
+    languages(first: 100, orderBy: {field: SIZE, direction: DESC}) {
+      edges { size node { name } }
+    }
+    readme0: object(expression: "HEAD:README.md") { ... on Blob { text } }
+    readme1: object(expression: "HEAD:README") { ... on Blob { text } }
+    readme2: object(expression: "HEAD:readme.md") { ... on Blob { text } }
+    readme3: object(expression: "HEAD:Readme.md") { ... on Blob { text } }
+  }
+}
+"""
+
 class GitHubService:
     def __init__(self):
-        self.token = os.getenv('GITHUB_TOKEN')
-        self.base_url = "https://api.github.com"
+        # Requests are spread over every configured token by remaining quota
+        self.credentials = CredentialPool(tokens_from_env())
+        self.token = self.credentials.credentials[0].token
+        self.base_url = os.getenv('GITHUB_API_URL', 'https://api.github.com').rstrip('/')
+        self.graphql_url = os.getenv('GITHUB_GRAPHQL_URL', f"{self.base_url}/graphql")
+        # Fetch metadata, README, languages and open issues in one GraphQL query when a token is set
+        self.use_graphql = os.getenv('GITHUB_USE_GRAPHQL', 'true').lower() != 'false'
         self.headers = {
-            'Authorization': f'token {self.token}',
             'Accept': 'application/vnd.github.v3+json'
         }
-        self.rate_limit_remaining = 5000  # Default value
-        self.rate_limit_reset = 0
         self.use_api = True  # Flag to control API usage
-        self.last_request_time = 0
-        self.min_request_interval = 0.1  # Minimum time between requests (100ms)
+        # Keep-alive connection pool shared by every GitHubService instance
+        self.session = shared_session('GITHUB')
+        # Disk-backed ETag cache; 304 revalidations do not count against the rate limit
+        self.response_cache = None
+        if os.getenv('GITHUB_CACHE_ENABLED', 'true').lower() != 'false':
+            self.response_cache = shared_response_cache(
+                os.getenv('GITHUB_CACHE_DIR', os.path.join('.cache', 'http')),
+                int(os.getenv('GITHUB_CACHE_MAX_BYTES', str(256 * 1024 * 1024)))
+            )
+        # List files with one recursive Git Trees call instead of walking /contents
+        self.use_tree_listing = os.getenv('GITHUB_USE_TREE_LISTING', 'true').lower() != 'false'
+        # Local mirrors read by every git fallback instead of a fresh clone each time
+        self.git_mirror = shared_git_mirror()
+        # 'mirror' reads file contents from the local mirror instead of the API
+        self.content_source = os.getenv('GITHUB_CONTENT_SOURCE', 'api').lower()
+        # Paginated lists: upper bounds and whether the next page is requested early
+        self.max_issues = int(os.getenv('GITHUB_MAX_ISSUES', '1000'))
+        self.max_contributors = int(os.getenv('GITHUB_MAX_CONTRIBUTORS', '500'))
+        self.prefetch_pages = os.getenv('GITHUB_PREFETCH_PAGES', 'true').lower() != 'false'
 
-    def _handle_rate_limit(self, response: requests.Response) -> None:
+    @property
+    def reads_locally(self) -> bool:
+        """True when file contents come from the local git mirror rather than the API."""
+        return self.content_source == 'mirror'
+
+    def _handle_rate_limit(self, credential: Credential, response: requests.Response) -> None:
         """Handle rate limit information from response headers."""
-        if 'X-RateLimit-Remaining' in response.headers:
-            self.rate_limit_remaining = int(response.headers['X-RateLimit-Remaining'])
-        if 'X-RateLimit-Reset' in response.headers:
-            self.rate_limit_reset = int(response.headers['X-RateLimit-Reset'])
+        credential.limiter.update(response.headers)
 
     def _should_use_api(self) -> bool:
-        """Determine whether to use API or fallback to git."""
+        """Determine whether to use API or fallback to git.
+
+        Falls back only while every token is below its reserve; the API is
+        used again as soon as one of them resets.
+        """
         if not self.use_api:
             return False
-        if self.rate_limit_remaining <= 10:  # Switch to git if few requests remaining
-            self.use_api = False
-            logger.warning("Switching to git fallback due to low rate limit")
+        if not self.credentials.has_quota():  # Switch to git if few requests remaining
+            logger.warning("Using git fallback until the GitHub rate limit resets "
+                           f"in {self.credentials.seconds_until_available():.0f} seconds")
             return False
         return True
 
     def _wait_for_rate_limit(self) -> None:
         """Wait if rate limit is close to being exceeded."""
-        current_time = time.time()
-        if current_time < self.rate_limit_reset and self.rate_limit_remaining <= 10:
-            wait_time = self.rate_limit_reset - current_time + 1
-            logger.info(f"Rate limit nearly exceeded. Waiting for {wait_time} seconds")
-            time.sleep(wait_time)
+        wait_time = self.credentials.seconds_until_available()
+        if wait_time > 0:
+            logger.info(f"Rate limit nearly exceeded. Waiting for {wait_time + 1} seconds")
+            time.sleep(wait_time + 1)
+
+    def rate_limit_stats(self) -> List[Dict[str, Any]]:
+        """Quota and pacing state of each configured token."""
+        return self.credentials.stats()
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Connection reuse metrics for the shared GitHub session."""
+        return pool_stats(self.session)
+
+    def _send(self, method: str, url: str, headers: Optional[Dict[str, str]] = None,
+              credential: Optional[Credential] = None, **kwargs) -> requests.Response:
+        """Send a request through the pooled session with the default GitHub headers.
+
+        Plain GET requests are revalidated against the response cache, and a
+        304 answer is turned back into the cached 200 response.
+        """
+        request_headers = dict(self.headers)
+        if credential:
+            request_headers.update(credential.auth_headers())
+        if headers:
+            request_headers.update(headers)
+
+        cache_key = None
+        entry = None
+        if self.response_cache and method == 'GET' and not kwargs.get('stream'):
+            cache_key = self.response_cache.key(url, kwargs.get('params'), request_headers)
+            entry = self.response_cache.lookup(cache_key)
+            if entry:
+                request_headers.update(self.response_cache.conditional_headers(entry))
+
+        response = self.session.request(method, url, headers=request_headers, **kwargs)
+
+        if cache_key:
+            if response.status_code == 304 and entry:
+                return self.response_cache.revalidated_response(entry, response)
+            self.response_cache.record_miss()
+            self.response_cache.store_response(cache_key, response)
+        return response
 
     def _make_request(self, url: str, method: str = 'GET', **kwargs) -> Tuple[Optional[requests.Response], bool]:
-        """Make an API request with rate limit handling."""
+        """Make an API request with rate limit handling.
+
+        The request goes out on the token with the most quota left and is
+        retried on another token if GitHub reports that one as exhausted.
+        """
         if not self._should_use_api():
             return None, False
 
-        # Ensure minimum time between requests
-        current_time = time.time()
-        time_since_last_request = current_time - self.last_request_time
-        if time_since_last_request < self.min_request_interval:
-            time.sleep(self.min_request_interval - time_since_last_request)
+        tried: List[Credential] = []
+        while True:
+            # Reserve quota and wait for a pacing token shared across threads
+            credential = self.credentials.acquire(exclude=tried)
+            if credential is None:
+                logger.warning("Rate limit reserve reached on every token, using git fallback")
+                return None, False
+            tried.append(credential)
 
-        try:
-            response = requests.request(method, url, headers=self.headers, **kwargs)
-            self.last_request_time = time.time()
-            self._handle_rate_limit(response)
+            try:
+                response = self._send(method, url, credential=credential, **kwargs)
+                self._handle_rate_limit(credential, response)
+            except requests.exceptions.RequestException as e:
+                logger.error(f"API request failed: {str(e)}")
+                return None, False
+            finally:
+                # From here on the response headers account for this request
+                credential.limiter.release()
 
             if response.status_code == 403 and 'rate limit exceeded' in response.text.lower():
-                logger.warning("Rate limit exceeded, switching to git fallback")
-                self.use_api = False
-                return None, False
+                logger.warning(f"Rate limit exceeded for credential {credential.key}")
+                credential.limiter.exhaust()
+                continue
 
             return response, True
-        except requests.exceptions.RequestException as e:
-            logger.error(f"API request failed: {str(e)}")
-            return None, False
 
+    @memoized('repository')
     def get_repository(self, username: str, repo_name: str) -> Optional[Dict[str, Any]]:
         """Get repository information with fallback."""
         url = f"{self.base_url}/repos/{username}/{repo_name}"
@@ -94,34 +296,204 @@ class GitHubService:
             logger.error(f"Git fallback failed: {str(e)}")
             return None
 
+    @memoized('overview')
+    def get_repository_overview(self, username: str, repo_name: str) -> Optional[Dict[str, Any]]:
+        """Fetch metadata, README, languages and open issues with one GraphQL query.
+
+        Returns {'repository', 'readme', 'languages', 'issues', 'issues_complete',
+        'head_commit'} shaped like the REST results, or None when GraphQL is
+        disabled, no token is configured or the query fails. Inside a fetch
+        context the REST methods then answer from these results.
+        """
+        if not self.use_graphql or not any(c.token for c in self.credentials.credentials):
+            return None
+        response, used_api = self._make_request(self.graphql_url, method='POST', json={
+            'query': REPOSITORY_OVERVIEW_QUERY,
+            'variables': {'owner': username, 'name': repo_name, 'issues': 100}
+        })
+        if not used_api or not response or response.status_code != 200:
+            return None
+        repo = (response.json().get('data') or {}).get('repository')
+        if not repo:
+            return None
+
+        open_issue_count = repo['openIssueCount']['totalCount']
+        issues = [{
+            'number': issue['number'],
+            'title': issue['title'],
+            'state': issue['state'].lower(),
+            'created_at': issue['createdAt'],
+            'html_url': issue['url']
+        } for issue in repo['openIssues']['nodes']]
+        readme = next((repo[f'readme{i}']['text'] for i in range(4)
+                       if repo.get(f'readme{i}') and repo[f'readme{i}'].get('text') is not None), None)
+        branch = repo.get('defaultBranchRef') or {}
+
+        overview = {
+            'repository': {
+                'name': repo['name'],
+                'full_name': repo['nameWithOwner'],
+                'description': repo['description'],
+                'html_url': repo['url'],
+                'clone_url': f"{repo['url']}.git",
+                'stargazers_count': repo['stargazerCount'],
+                'forks_count': repo['forkCount'],
+                # REST reports stars as watchers_count; GraphQL's watchers are its subscribers_count
+                'watchers_count': repo['stargazerCount'],
+                'subscribers_count': repo['watchers']['totalCount'],
+                # Like the REST field, this counts open pull requests too
+                'open_issues_count': open_issue_count + repo['openPullRequestCount']['totalCount'],
+                'language': (repo.get('primaryLanguage') or {}).get('name'),
+                'default_branch': branch.get('name'),
+                'created_at': repo['createdAt'],
+                'updated_at': repo['updatedAt'],
+                'pushed_at': repo['pushedAt']
+            },
+            'readme': readme,
+            'languages': {edge['node']['name']: edge['size'] for edge in repo['languages']['edges']},
+            'issues': issues,
+            # GraphQL issues exclude pull requests; the list is complete when nothing was cut off
+            'issues_complete': len(issues) >= open_issue_count,
+            'head_commit': (branch.get('target') or {}).get('oid')
+        }
+
+        context = _current_fetch_context.get()
+        if context is not None:
+            context.prime(_memo_key('repository', username, repo_name), overview['repository'])
+            if overview['readme'] is not None:
+                # Otherwise the README may just have another name; get_readme looks it up
+                context.prime(_memo_key('readme', username, repo_name), overview['readme'])
+            context.prime(_memo_key('languages', username, repo_name), overview['languages'])
+            if overview['head_commit']:
+                context.prime(_memo_key('head_commit', username, repo_name), overview['head_commit'])
+            if overview['issues_complete']:
+                context.prime(_memo_key('issues', username, repo_name), overview['issues'])
+        return overview
+
+    # Preferred README names, in the order the old per-name probing used
+    README_FILES = ['README.md', 'README', 'readme.md', 'Readme.md']
+
+    @classmethod
+    def _find_readme(cls, paths: Iterable[str]) -> Optional[str]:
+        """Pick the top-level README (any extension) from a file listing."""
+        candidates = [path for path in paths
+                      if '/' not in path and path.lower().split('.', 1)[0] == 'readme']
+        if not candidates:
+            return None
+        return min(candidates, key=lambda path: (
+            cls.README_FILES.index(path) if path in cls.README_FILES else len(cls.README_FILES), path
+        ))
+
+    @memoized('readme')
     def get_readme(self, username: str, repo_name: str) -> Optional[str]:
-        """Get repository README content."""
-        # Try different README filenames
-        readme_files = ['README.md', 'README', 'readme.md', 'Readme.md']
-        
-        for readme_file in readme_files:
-            url = f"{self.base_url}/repos/{username}/{repo_name}/contents/{readme_file}"
-            response = requests.get(url, headers=self.headers)
-            
-            if response.status_code == 200:
-                content = response.json()
-                if 'content' in content:
-                    try:
-                        # Decode base64 content
-                        decoded_content = base64.b64decode(content['content']).decode('utf-8')
-                        return decoded_content
-                    except Exception as e:
-                        print(f"Error decoding README content: {str(e)}")
-                        continue
-        
+        """Get repository README content.
+
+        Uses a file listing already fetched in this context when there is
+        one, and otherwise the /readme endpoint, which finds the README
+        whatever its name. Either way it costs a single request.
+        """
+        url = f"{self.base_url}/repos/{username}/{repo_name}/readme"
+        context = _current_fetch_context.get()
+        if context is not None:
+            # Listings are memoized under the head commit they were taken at
+            found, head = context.peek(_memo_key('head_commit', username, repo_name))
+            keys = []
+            for ref in ((head, None) if found and head else (None,)):
+                keys += [_memo_key('contents', username, repo_name, ref=ref), _memo_key('tree', username, repo_name, ref)]
+            for key in keys:
+                found, listing = context.peek(key)
+                if found and isinstance(listing, list):
+                    path = self._find_readme(item.get('path', '') for item in listing)
+                    if path is None:
+                        return None
+                    sha = next(item.get('sha') for item in listing if item.get('path') == path)
+                    # Blobs never change, so the response cache can serve this by SHA
+                    url = f"{self.base_url}/repos/{username}/{repo_name}/git/blobs/{sha}"
+                    break
+
+        response, used_api = self._make_request(url)
+        if used_api and response and response.status_code == 200:
+            content = response.json()
+            if 'content' in content:
+                try:
+                    # Decode base64 content
+                    return base64.b64decode(content['content']).decode('utf-8')
+                except Exception as e:
+                    print(f"Error decoding README content: {str(e)}")
         return None
 
-    def get_repository_contents(self, username: str, repo_name: str, path: str = "") -> List[Dict[str, Any]]:
-        """Get repository contents recursively."""
+    @memoized('contents')
+    def get_repository_contents(self, username: str, repo_name: str, path: str = "",
+                                ref: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get repository contents recursively at ref (the default branch by default)."""
+        if not path and self.use_tree_listing:
+            tree = self.get_repository_tree(username, repo_name, ref)
+            if tree is not None:
+                return tree
+        return self._walk_repository_contents(username, repo_name, path, ref)
+
+    @memoized('tree')
+    def get_repository_tree(self, username: str, repo_name: str, ref: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+        """List every file in the repository with the recursive Git Trees API.
+
+        Returns items shaped like the Contents API ('type', 'path', 'name', 'sha', 'size'),
+        or None if the tree could not be fetched.
+        """
+        if ref is None:
+            repo_data = self.get_repository(username, repo_name)
+            ref = repo_data.get('default_branch') if isinstance(repo_data, dict) else None
+        return self._list_tree(username, repo_name, ref or 'HEAD', "")
+
+    def _list_tree(self, username: str, repo_name: str, tree_sha: str, prefix: str) -> Optional[List[Dict[str, Any]]]:
+        """Fetch a tree recursively, splitting it into subtrees only when GitHub truncates it."""
+        url = f"{self.base_url}/repos/{username}/{repo_name}/git/trees/{tree_sha}"
+        response, used_api = self._make_request(url, params={'recursive': '1'})
+        if not used_api or not response or response.status_code != 200:
+            return None
+        tree = response.json()
+
+        if tree.get('truncated'):
+            # Too large for one response: list this level and recurse into each subtree
+            response, used_api = self._make_request(url)
+            if not used_api or not response or response.status_code != 200:
+                return None
+            all_contents = []
+            for entry in response.json().get('tree', []):
+                if entry.get('type') == 'tree':
+                    sub_contents = self._list_tree(username, repo_name, entry['sha'], f"{prefix}{entry['path']}/")
+                    if sub_contents is None:
+                        return None
+                    all_contents.extend(sub_contents)
+                else:
+                    item = self._tree_entry_to_item(entry, prefix)
+                    if item:
+                        all_contents.append(item)
+            return all_contents
+
+        return [item for item in (self._tree_entry_to_item(entry, prefix) for entry in tree.get('tree', [])) if item]
+
+    def _tree_entry_to_item(self, entry: Dict[str, Any], prefix: str) -> Optional[Dict[str, Any]]:
+        """Map a regular-file Git Trees entry onto a Contents API style item."""
+        # Subtrees, submodules ('commit') and symlinks (mode 120000) are not files
+        if entry.get('type') != 'blob' or entry.get('mode') == '120000':
+            return None
+        path = f"{prefix}{entry['path']}"
+        return {
+            'type': 'file',
+            'name': path.rsplit('/', 1)[-1],
+            'path': path,
+            'sha': entry.get('sha'),
+            'size': entry.get('size', 0),
+            'url': entry.get('url')
+        }
+
+    def _walk_repository_contents(self, username: str, repo_name: str, path: str = "",
+                                  ref: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get repository contents by walking the Contents API one directory at a time."""
         url = f"{self.base_url}/repos/{username}/{repo_name}/contents/{path}"
-        response = requests.get(url, headers=self.headers)
+        response, used_api = self._make_request(url, params={'ref': ref} if ref else None)
         
-        if response.status_code != 200:
+        if not used_api or not response or response.status_code != 200:
             return []
             
         contents = response.json()
@@ -134,42 +506,112 @@ class GitHubService:
                 all_contents.append(item)
             elif item['type'] == 'dir':
                 # Recursively get contents of subdirectories
-                sub_contents = self.get_repository_contents(username, repo_name, item['path'])
+                sub_contents = self._walk_repository_contents(username, repo_name, item['path'], ref)
                 all_contents.extend(sub_contents)
                 
         return all_contents
 
-    def get_file_content(self, username: str, repo_name: str, path: str) -> Optional[str]:
-        """Get content of a specific file."""
+    def get_file_content(self, username: str, repo_name: str, path: str, ref: Optional[str] = None) -> Optional[str]:
+        """Get content of a specific file at ref (the default branch by default)."""
+        # Binary files decode to None anyway; do not download them first
+        if self._is_binary_file(path):
+            return None
+        if self.content_source == 'mirror':
+            try:
+                for _, content in self._iter_mirror_contents(username, repo_name, [path], prefetch=False, ref=ref):
+                    return content
+                return None
+            except (OSError, subprocess.CalledProcessError):
+                # The mirror cannot serve ref; ask the API instead
+                pass
+
         url = f"{self.base_url}/repos/{username}/{repo_name}/contents/{path}"
-        response = requests.get(url, headers=self.headers)
+        response, used_api = self._make_request(url, params={'ref': ref} if ref else None)
         
-        if response.status_code == 200:
+        if used_api and response and response.status_code == 200:
             content = response.json()
             if 'content' in content:
                 try:
                     # Decode base64 content
                     decoded_content = base64.b64decode(content['content'])
-                    
-                    # Check if it's a binary file
-                    if self._is_binary_file(path):
-                        return None
-                        
-                    # Try different encodings
-                    encodings = ['utf-8', 'latin-1', 'cp1252']
-                    for encoding in encodings:
-                        try:
-                            return decoded_content.decode(encoding)
-                        except UnicodeDecodeError:
-                            continue
-                            
-                    # If all encodings fail, return None
-                    return None
+                    return self._decode_content(decoded_content, path)
                 except Exception as e:
                     print(f"Error decoding file content: {str(e)}")
                     return None
         return None
 
+    def iter_file_contents(self, username: str, repo_name: str, paths: Iterable[str],
+                           ref: Optional[str] = None) -> Iterator[Tuple[str, Optional[str]]]:
+        """Stream decoded contents for many files at ref from a single repository tarball.
+
+        Yields (path, content) in archive order. Paths missing from the
+        archive are not yielded, so callers can fetch them individually.
+        """
+        if self.content_source == 'mirror':
+            yield from self._iter_mirror_contents(username, repo_name, paths, ref=ref)
+            return
+
+        wanted = set(paths)
+        url = f"{self.base_url}/repos/{username}/{repo_name}/tarball" + (f"/{ref}" if ref else "")
+        response, used_api = self._make_request(url, stream=True)
+        if not used_api or not response or response.status_code != 200:
+            return
+
+        with response:
+            # Let urllib3 undo any transfer compression; tarfile handles the gzip layer
+            response.raw.decode_content = True
+            for path, data in ArchiveContentSource(response.raw).iter_files(wanted):
+                yield path, self._decode_content(data, path)
+
+    def _iter_mirror_contents(self, username: str, repo_name: str, paths: Iterable[str],
+                              prefetch: bool = True, ref: Optional[str] = None) -> Iterator[Tuple[str, Optional[str]]]:
+        """Stream decoded contents at ref (the mirror's HEAD by default) through one cat-file pipe.
+
+        Blobs missing from the blobless mirror are fetched in a single request
+        first. Paths not found are not yielded. A ref the mirror does not
+        have even after fetching raises instead of reading as missing files.
+        """
+        paths = list(paths)
+        try:
+            with self.git_mirror.open(username, repo_name) as mirror_path:
+                if ref:
+                    # The API may already report a push the mirror has not fetched yet
+                    self.git_mirror.ensure_commit(mirror_path, ref)
+                # Reading by blob SHA avoids resolving every path through the tree again
+                shas = self.git_mirror.blob_shas(mirror_path, paths, ref or 'HEAD')
+                if prefetch:
+                    self.git_mirror.prefetch_blobs(mirror_path, shas.values(), ref or 'HEAD')
+                reader = self.git_mirror.blob_reader(username, repo_name)
+                # Read in the order asked for, which may be a priority order
+                paths_by_sha = {}
+                for path in paths:
+                    if path in shas:
+                        paths_by_sha.setdefault(shas[path], []).append(path)
+                for sha, data in reader.read_many(list(paths_by_sha)):
+                    if data is not None:
+                        for path in paths_by_sha[sha]:
+                            yield path, self._decode_content(data, path)
+        except (OSError, subprocess.CalledProcessError) as e:
+            logger.error(f"Reading contents from the git mirror failed: {str(e)}")
+            raise
+
+    def _decode_content(self, data: bytes, path: str) -> Optional[str]:
+        """Decode raw file bytes to text, returning None for binary files."""
+        # Check if it's a binary file
+        if self._is_binary_file(path):
+            return None
+
+        # Try different encodings
+        encodings = ['utf-8', 'latin-1', 'cp1252']
+        for encoding in encodings:
+            try:
+                return data.decode(encoding)
+            except UnicodeDecodeError:
+                continue
+
+        # If all encodings fail, return None
+        return None
+
     def _is_binary_file(self, filename: str) -> bool:
         """Check if a file is likely to be binary."""
         binary_extensions = {
@@ -186,14 +628,55 @@ class GitHubService:
         }
         return any(filename.lower().endswith(ext) for ext in binary_extensions)
 
+    def _iter_pages(self, url: str, params: Optional[Dict[str, Any]] = None,
+                    max_items: Optional[int] = None) -> Iterator[List[Dict[str, Any]]]:
+        """Yield the pages of a list endpoint, following its Link headers.
+
+        Pages hold up to 100 items. While a page is being consumed the next
+        one is already requested in the background, unless prefetching is
+        disabled. Stops after max_items items.
+        """
+        executor = ThreadPoolExecutor(max_workers=1) if self.prefetch_pages else None
+        try:
+            pending = self._make_request(url, params=dict(params or {}, per_page=100))
+            count = 0
+            while pending is not None:
+                response, used_api = pending.result() if isinstance(pending, Future) else pending
+                if not used_api or not response or response.status_code != 200:
+                    return
+                page = response.json()
+                if not isinstance(page, list):
+                    return
+                if max_items is not None:
+                    page = page[:max_items - count]
+                count += len(page)
+
+                pending = None
+                # The next link already carries per_page and the other query parameters
+                next_url = response.links.get('next', {}).get('url')
+                if next_url and (max_items is None or count < max_items):
+                    if executor:
+                        pending = submit_with_context(executor, self._make_request, next_url)
+                    else:
+                        pending = self._make_request(next_url)
+                yield page
+        finally:
+            if executor:
+                executor.shutdown(wait=False)
+
+    def iter_contributors(self, username: str, repo_name: str,
+                          max_items: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Stream repository contributors page by page, up to GITHUB_MAX_CONTRIBUTORS."""
+        url = f"{self.base_url}/repos/{username}/{repo_name}/contributors"
+        for page in self._iter_pages(url, max_items=max_items or self.max_contributors):
+            yield from page
+
+    @memoized('contributors')
     def get_contributors(self, username: str, repo_name: str) -> List[Dict[str, Any]]:
         """Get repository contributors."""
-        url = f"{self.base_url}/repos/{username}/{repo_name}/contributors"
-        response = requests.get(url, headers=self.headers)
-        if response.status_code == 200:
-            return response.json()
-        return []
+        return list(self.iter_contributors(username, repo_name))
 
+    @memoized('commit_activity')
     def get_commit_activity(self, username: str, repo_name: str) -> List[Dict[str, Any]]:
         """Get enhanced commit activity with frequency metrics."""
         url = f"{self.base_url}/repos/{username}/{repo_name}/stats/commit_activity"
@@ -227,25 +710,11 @@ class GitHubService:
     def _get_repo_info_git(self, username: str, repo_name: str) -> Optional[Dict[str, Any]]:
         """Fallback method to get repository info using git commands."""
         try:
-            import subprocess
-            from pathlib import Path
-            import tempfile
-
-            # Create temporary directory for git clone
-            with tempfile.TemporaryDirectory() as temp_dir:
-                repo_url = f"https://github.com/{username}/{repo_name}.git"
-                
-                # Clone repository
-                subprocess.run(['git', 'clone', '--depth', '1', repo_url, temp_dir], 
-                             check=True, capture_output=True)
-                
-                # Get repository info
-                repo_path = Path(temp_dir)
-                
+            with self.git_mirror.open(username, repo_name) as mirror_path:
                 # Get commit count
                 commit_count = subprocess.run(
                     ['git', 'rev-list', '--count', 'HEAD'],
-                    cwd=temp_dir,
+                    cwd=mirror_path,
                     capture_output=True,
                     text=True
                 ).stdout.strip()
@@ -253,15 +722,15 @@ class GitHubService:
                 # Get last commit date
                 last_commit = subprocess.run(
                     ['git', 'log', '-1', '--format=%cd'],
-                    cwd=temp_dir,
+                    cwd=mirror_path,
                     capture_output=True,
                     text=True
                 ).stdout.strip()
                 
-                # Get branch count
+                # Get branch count (the mirror keeps remote branches as local ones)
                 branch_count = subprocess.run(
-                    ['git', 'branch', '-r'],
-                    cwd=temp_dir,
+                    ['git', 'branch'],
+                    cwd=mirror_path,
                     capture_output=True,
                     text=True
                 ).stdout.count('\n')
@@ -269,7 +738,7 @@ class GitHubService:
                 return {
                     'name': repo_name,
                     'full_name': f"{username}/{repo_name}",
-                    'description': self._get_repo_description_git(temp_dir),
+                    'description': self._get_repo_description_git(mirror_path),
                     'stargazers_count': 0,  # Not available via git
                     'forks_count': 0,  # Not available via git
                     'open_issues_count': 0,  # Not available via git
@@ -298,50 +767,11 @@ class GitHubService:
     def _get_commit_activity_git(self, username: str, repo_name: str) -> List[Dict[str, Any]]:
         """Fallback method to get commit activity using git commands."""
         try:
-            import subprocess
-            from datetime import datetime, timedelta
-            import tempfile
-
-            with tempfile.TemporaryDirectory() as temp_dir:
-                repo_url = f"https://github.com/{username}/{repo_name}.git"
-                
-                # Clone repository
-                subprocess.run(['git', 'clone', '--depth', '1', repo_url, temp_dir], 
-                             check=True, capture_output=True)
-                
-                # Get commit activity for the last year
-                end_date = datetime.now()
-                start_date = end_date - timedelta(days=365)
-                
-                # Get commit activity by week
-                activity_data = []
-                current_date = start_date
-                
-                while current_date < end_date:
-                    week_end = current_date + timedelta(days=7)
-                    
-                    # Get commits for the week
-                    commits = subprocess.run(
-                        ['git', 'log', '--since', current_date.isoformat(),
-                         '--until', week_end.isoformat(), '--format=%H'],
-                        cwd=temp_dir,
-                        capture_output=True,
-                        text=True
-                    ).stdout.strip().split('\n')
-                    
-                    # Count commits
-                    commit_count = len([c for c in commits if c])
-                    
-                    activity_data.append({
-                        'week': int(current_date.timestamp()),
-                        'total': commit_count,
-                        'days': [0] * 7,  # Not available via git
-                        'commit_frequency': commit_count / 7 if commit_count > 0 else 0,
-                        'source': 'git_fallback'
-                    })
-                    
-                    current_date = week_end
-                
+            with self.git_mirror.open(username, repo_name) as mirror_path:
+                # One git log pass over the last year, bucketed into weeks and days
+                activity_data = self._enhance_commit_metrics(commit_activity_from_git(mirror_path))
+                for week in activity_data:
+                    week['source'] = 'git_fallback'
                 return activity_data
         except Exception as e:
             logger.error(f"Git commit activity fallback failed: {str(e)}")
@@ -380,18 +810,82 @@ class GitHubService:
             'total_weeks': total_weeks
         }
 
+    def iter_issues(self, username: str, repo_name: str, state: str = 'open',
+                    max_items: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Stream repository issues page by page, up to GITHUB_MAX_ISSUES.
+
+        The REST endpoint lists pull requests as issues too; they are skipped
+        so the result matches the GraphQL overview. The limit bounds the
+        items read, pull requests included.
+        """
+        url = f"{self.base_url}/repos/{username}/{repo_name}/issues"
+        for page in self._iter_pages(url, params={'state': state}, max_items=max_items or self.max_issues):
+            yield from (issue for issue in page if 'pull_request' not in issue)
+
+    @memoized('issues')
     def get_issues(self, username: str, repo_name: str) -> List[Dict[str, Any]]:
         """Get repository issues."""
-        url = f"{self.base_url}/repos/{username}/{repo_name}/issues"
-        response = requests.get(url, headers=self.headers)
-        if response.status_code == 200:
-            return response.json()
-        return []
+        return list(self.iter_issues(username, repo_name))
 
+    @memoized('languages')
     def get_languages(self, username: str, repo_name: str) -> Dict[str, int]:
         """Get repository languages."""
         url = f"{self.base_url}/repos/{username}/{repo_name}/languages"
-        response = requests.get(url, headers=self.headers)
-        if response.status_code == 200:
+        response, used_api = self._make_request(url)
+        if used_api and response and response.status_code == 200:
             return response.json()
-        return {} 
\ No newline at end of file
+        return {}
+
+    @memoized('head_commit')
+    def get_head_commit(self, username: str, repo_name: str, ref: Optional[str] = None) -> Optional[str]:
+        """Get the commit SHA that ref (default branch by default) points to."""
+        if ref is None:
+            repo_data = self.get_repository(username, repo_name)
+            ref = repo_data.get('default_branch') if isinstance(repo_data, dict) else None
+        url = f"{self.base_url}/repos/{username}/{repo_name}/commits/{ref or 'HEAD'}"
+        # The sha media type returns just the SHA instead of the full commit
+        response, used_api = self._make_request(url, headers={'Accept': 'application/vnd.github.sha'})
+        if used_api and response and response.status_code == 200:
+            return response.text.strip() or None
+        return None
+
+    def compare_commits(self, username: str, repo_name: str, base: str, head: str) -> Optional[Dict[str, Any]]:
+        """Compare two commits, including the list of changed files."""
+        url = f"{self.base_url}/repos/{username}/{repo_name}/compare/{base}...{head}"
+        response, used_api = self._make_request(url)
+        if used_api and response and response.status_code == 200:
+            return response.json()
+        return None
+
+    def get_blob_sizes(self, username: str, repo_name: str, ref: str, paths: Iterable[str]) -> Dict[str, int]:
+        """Map each of paths that is a file at ref to its size in bytes.
+
+        The compare endpoint does not report sizes. With a token they come
+        from one GraphQL query with an aliased field per path; otherwise
+        from the recursive tree listing at ref.
+        """
+        paths = list(paths)
+        if not paths:
+            return {}
+        if self.use_graphql and any(c.token for c in self.credentials.credentials):
+            # Paths are passed as variables so they never need escaping in the query
+            variables: Dict[str, Any] = {'owner': username, 'name': repo_name}
+            declarations = []
+            fields = []
+            for i, path in enumerate(paths):
+                variables[f'e{i}'] = f"{ref}:{path}"
+                declarations.append(f"$e{i}: String!")
+                fields.append(f"f{i}: object(expression: $e{i}) {{ ... on Blob {{ byteSize }} }}")
+            query = (f"query($owner: String!, $name: String!, {', '.join(declarations)}) "
+                     f"{{ repository(owner: $owner, name: $name) {{ {' '.join(fields)} }} }}")
+            response, used_api = self._make_request(self.graphql_url, method='POST', json={
+                'query': query, 'variables': variables
+            })
+            if used_api and response and response.status_code == 200:
+                repo = (response.json().get('data') or {}).get('repository')
+                if repo:
+                    return {path: repo[f'f{i}']['byteSize'] for i, path in enumerate(paths)
+                            if (repo.get(f'f{i}') or {}).get('byteSize') is not None}
+        wanted = set(paths)
+        tree = self.get_repository_tree(username, repo_name, ref)
+        return {item['path']: item.get('size', 0) for item in tree or [] if item['path'] in wanted}
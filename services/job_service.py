@@ -0,0 +1,240 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from services.analysis_service import AnalysisService
+from utils.single_flight import SingleFlight
+
+
+def analysis_key(username: str, repo_name: str, target: str, base_sha: Optional[str] = None) -> Tuple:
+    """Single-flight key for one AnalysisService computation.
+
+    target names the AnalysisService method that computes the result;
+    base_sha is part of the key because an incremental analysis differs
+    from a full one.
+    """
+    return (username.lower(), repo_name.lower(), target, base_sha)
+
+
+class JobService:
+    """Run analyses on a bounded background worker pool.
+
+    Job status, progress and results live in SQLite, so no external broker
+    is needed. Submitting a job identical to one still queued or running
+    returns the existing job instead of starting another.
+
+    Several processes may share the database. Each one holds a lease on
+    its unfinished jobs by refreshing their heartbeat; jobs whose lease
+    has run out belonged to a process that died and are marked failed.
+    """
+
+    ACTIONS = ('complete_analysis', 'code_feedback', 'generate_readme')
+
+    def __init__(self, analysis_service: AnalysisService, db_path: Optional[str] = None,
+                 max_workers: Optional[int] = None, single_flight: Optional[SingleFlight] = None):
+        self.analysis_service = analysis_service
+        # Shared with the web views so a job and a page load for the same analysis run once
+        self.single_flight = single_flight
+        self.db_path = db_path or os.getenv('JOB_DB_PATH', os.path.join('.cache', 'jobs.sqlite3'))
+        self.max_workers = max_workers or int(os.getenv('JOB_MAX_WORKERS', '4'))
+        # Finished jobs older than this are pruned
+        self.retention_seconds = int(os.getenv('JOB_RETENTION_SECONDS', str(24 * 60 * 60)))
+        # Unfinished jobs whose heartbeat is older than this are failed
+        self.lease_seconds = float(os.getenv('JOB_LEASE_SECONDS', '60'))
+        self.owner = uuid.uuid4().hex
+
+        if self.db_path != ':memory:' and os.path.dirname(self.db_path):
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Tuple, str] = {}
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='analysis-job')
+        self._init_db()
+        self._expire_leases()
+        self._heartbeat = threading.Thread(target=self._renew_leases, name='analysis-job-lease', daemon=True)
+        self._heartbeat.start()
+
+    def _init_db(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    username TEXT NOT NULL,
+                    repo_name TEXT NOT NULL,
+                    action TEXT NOT NULL,
+                    view_type TEXT,
+                    base_sha TEXT,
+                    status TEXT NOT NULL,
+                    progress TEXT,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    owner TEXT,
+                    heartbeat_at REAL
+                )"""
+            )
+            # Databases created before leases existed lack these columns
+            columns = {row['name'] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            for column, kind in (('owner', 'TEXT'), ('heartbeat_at', 'REAL')):
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+
+    def _expire_leases(self) -> None:
+        """Fail unfinished jobs whose owning process stopped renewing their lease."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'failed', progress = 'Failed', "
+                "error = 'Interrupted by a server restart', updated_at = ? "
+                "WHERE status IN ('queued', 'running') AND COALESCE(heartbeat_at, updated_at) < ?",
+                (now, now - self.lease_seconds)
+            )
+
+    def _renew_leases(self) -> None:
+        """Refresh the heartbeat of this process's unfinished jobs, and expire other stale ones."""
+        while True:
+            time.sleep(self.lease_seconds / 3)
+            try:
+                with self._lock, self._conn:
+                    self._conn.execute(
+                        "UPDATE jobs SET heartbeat_at = ? WHERE owner = ? AND status IN ('queued', 'running')",
+                        (time.time(), self.owner)
+                    )
+                self._expire_leases()
+            except sqlite3.Error as e:
+                print(f"JobService: renewing job leases failed: {str(e)}")
+
+    def submit(self, username: str, repo_name: str, action: str = 'complete_analysis',
+               view_type: str = 'repo', base_sha: Optional[str] = None) -> str:
+        """Queue an analysis and return its job id."""
+        if action not in self.ACTIONS:
+            raise ValueError(f"Unsupported action: {action}")
+
+        # Jobs that run the same computation share a key, whatever the arguments it ignores
+        target, base_sha = self._target(action, view_type, base_sha)
+        key = analysis_key(username, repo_name, target, base_sha)
+        with self._lock:
+            job_id = self._in_flight.get(key)
+            if job_id:
+                return job_id
+
+            job_id = uuid.uuid4().hex
+            now = time.time()
+            with self._conn:
+                self._conn.execute(
+                    "DELETE FROM jobs WHERE status IN ('completed', 'failed') AND updated_at < ?",
+                    (now - self.retention_seconds,)
+                )
+                self._conn.execute(
+                    "INSERT INTO jobs (id, username, repo_name, action, view_type, base_sha, status, progress, "
+                    "created_at, updated_at, owner, heartbeat_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, 'queued', 'Waiting for a worker', ?, ?, ?, ?)",
+                    (job_id, username, repo_name, action, view_type, base_sha, now, now, self.owner, now)
+                )
+            self._in_flight[key] = job_id
+
+        self._executor.submit(self._run, job_id, key, username, repo_name, target, base_sha)
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return the job's status, progress and, once finished, its result or error."""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+
+        job = {
+            'job_id': row['id'],
+            'username': row['username'],
+            'repo_name': row['repo_name'],
+            'action': row['action'],
+            'view_type': row['view_type'],
+            'base_sha': row['base_sha'],
+            'status': row['status'],
+            'progress': row['progress'],
+            'created_at': row['created_at'],
+            'updated_at': row['updated_at']
+        }
+        if row['status'] == 'completed':
+            job['result'] = json.loads(row['result']) if row['result'] else None
+        if row['status'] == 'failed':
+            job['error'] = row['error']
+        return job
+
+    def _update(self, job_id: str, **fields: Any) -> None:
+        fields['updated_at'] = time.time()
+        assignments = ', '.join(f"{name} = ?" for name in fields)
+        with self._lock, self._conn:
+            self._conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def _run(self, job_id: str, key: Tuple, username: str, repo_name: str, target: str,
+             base_sha: Optional[str]) -> None:
+        self._update(job_id, status='running', progress='Started')
+        try:
+            result = self._execute(job_id, key, username, repo_name, target, base_sha)
+            if not isinstance(result, dict) or result.get('error'):
+                error = result.get('error') if isinstance(result, dict) else 'Invalid analysis data format'
+                self._update(job_id, status='failed', progress='Failed', error=error)
+            else:
+                self._update(job_id, status='completed', progress='Done', result=json.dumps(result, default=str))
+        except Exception as e:
+            print(f"JobService: job {job_id} for {username}/{repo_name} failed: {str(e)}")
+            self._update(job_id, status='failed', progress='Failed', error=str(e))
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def _execute(self, job_id: str, key: Tuple, username: str, repo_name: str, target: str,
+                 base_sha: Optional[str]) -> Any:
+        """Dispatch a job to the matching AnalysisService call.
+
+        A job waiting on an identical computation that is already running
+        gets that computation's progress messages.
+        """
+        progress = lambda message: self._update(job_id, progress=message)
+        if self.single_flight is None:
+            return self._dispatch(target, username, repo_name, base_sha, progress)
+        return self.single_flight.do(
+            key,
+            lambda: self._dispatch(target, username, repo_name, base_sha,
+                                   lambda message: self.single_flight.report(key, message)),
+            progress=progress
+        )
+
+    def _target(self, action: str, view_type: str, base_sha: Optional[str]) -> Tuple[str, Optional[str]]:
+        """Name of the AnalysisService method a job runs, and the base_sha it uses."""
+        if action == 'generate_readme':
+            return 'generate_readme', None
+        if action == 'code_feedback':
+            return 'get_code_feedback', None
+        if view_type == 'developer':
+            return 'get_developer_analysis', None
+        # Only the full analysis can run incrementally
+        return 'get_full_analysis', base_sha
+
+    def _dispatch(self, target: str, username: str, repo_name: str, base_sha: Optional[str],
+                  progress: Callable[[str], None]) -> Any:
+        if target == 'generate_readme':
+            return self.analysis_service.generate_readme(username, repo_name)
+        if target == 'get_code_feedback':
+            return self.analysis_service.get_code_feedback(username, repo_name)
+        if target == 'get_developer_analysis':
+            return self.analysis_service.get_developer_analysis(username, repo_name)
+        return self.analysis_service.get_full_analysis(username, repo_name, base_sha=base_sha, progress=progress)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) AS count FROM jobs GROUP BY status").fetchall()
+            in_flight = len(self._in_flight)
+        return {
+            'max_workers': self.max_workers,
+            'in_flight': in_flight,
+            'by_status': {row['status']: row['count'] for row in rows}
+        }
@@ -0,0 +1,246 @@
+import os
+import re
+import subprocess
+import logging
+from typing import Dict, Any, List, Optional, Tuple, Iterable, Iterator
+from services.blob_reader import GitBlobReader
+from services.github_service import GitHubService
+from utils.git_activity import commit_activity_from_git
+
+logger = logging.getLogger(__name__)
+
+
+class LocalRepositoryService:
+    """Serve a local git repository through the same interface as GitHubService.
+
+    Works with a working tree or a bare repository and never touches the
+    network. Everything is read from the committed HEAD, so results are
+    deterministic for a given commit. The owner and repository names passed
+    to each method are ignored.
+    """
+
+    # Decoding and metric helpers are shared with the GitHub-backed service
+    _decode_content = GitHubService._decode_content
+    _is_binary_file = GitHubService._is_binary_file
+    _enhance_commit_metrics = GitHubService._enhance_commit_metrics
+    _find_readme = GitHubService._find_readme
+    # File contents come from the repository itself, never a tarball
+    reads_locally = True
+
+    def __init__(self, path: str, ref: str = 'HEAD'):
+        self.path = os.path.abspath(path)
+        self.ref = ref
+        try:
+            self._git(['rev-parse', '--git-dir'])
+        except (OSError, subprocess.CalledProcessError):
+            raise ValueError(f"Not a git repository: {path}")
+        # Every file read goes through one long-lived cat-file process
+        self.blob_reader = GitBlobReader(self.path)
+
+    def _git(self, args: List[str], **kwargs) -> bytes:
+        return subprocess.run(['git'] + args, cwd=self.path, check=True,
+                              capture_output=True, **kwargs).stdout
+
+    def _git_text(self, args: List[str]) -> str:
+        return self._git(args).decode('utf-8', errors='replace').strip()
+
+    def get_repository(self, username: str, repo_name: str) -> Optional[Dict[str, Any]]:
+        """Get repository information from git metadata."""
+        try:
+            name = os.path.basename(self.path.rstrip(os.sep))
+            if name.endswith('.git'):
+                name = name[:-4]
+            branch = self._git_text(['symbolic-ref', '--short', '-q', 'HEAD']) if self.ref == 'HEAD' else self.ref
+            return {
+                'name': name,
+                'full_name': f"{username}/{repo_name}",
+                'description': self._get_description(),
+                'default_branch': branch or self.ref,
+                'stargazers_count': 0,  # Not available via git
+                'forks_count': 0,  # Not available via git
+                'watchers_count': 0,  # Not available via git
+                'open_issues_count': 0,  # Not available via git
+                'commit_count': int(self._git_text(['rev-list', '--count', self.ref])),
+                'last_commit_date': self._git_text(['log', '-1', '--format=%cd', self.ref]),
+                'clone_url': self.path,
+                'source': 'local'
+            }
+        except subprocess.CalledProcessError as e:
+            logger.error(f"Reading local repository {self.path} failed: {e.stderr!r}")
+            return None
+
+    def _get_description(self) -> str:
+        """Read .git/description unless it is the placeholder git init writes."""
+        git_dir = self._git_text(['rev-parse', '--absolute-git-dir'])
+        try:
+            with open(os.path.join(git_dir, 'description'), encoding='utf-8') as f:
+                description = f.read().strip()
+        except OSError:
+            description = ''
+        if not description or description.startswith('Unnamed repository'):
+            return "No description available"
+        return description
+
+    def get_readme(self, username: str, repo_name: str) -> Optional[str]:
+        """Get repository README content."""
+        contents = self.get_repository_contents(username, repo_name)
+        path = self._find_readme(item['path'] for item in contents)
+        if path is None:
+            return None
+        try:
+            data = self.blob_reader.read(next(item['sha'] for item in contents if item['path'] == path))
+            return data.decode('utf-8') if data is not None else None
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"Error decoding README content: {str(e)}")
+            return None
+
+    def get_repository_contents(self, username: str, repo_name: str, path: str = "",
+                                ref: Optional[str] = None) -> List[Dict[str, Any]]:
+        """List every regular file at ref (the service's ref by default), shaped like GitHub's Contents API items."""
+        return self._list_files(ref or self.ref, [path] if path else [])
+
+    def _list_files(self, ref: str, paths: List[str]) -> List[Dict[str, Any]]:
+        """List the regular files at ref, limited to paths when any are given."""
+        args = ['ls-tree', '-r', '-l', '-z', ref]
+        if paths:
+            args += ['--'] + paths
+        contents = []
+        for record in self._git(args).split(b'\0'):
+            if not record:
+                continue
+            meta, _, file_path = record.partition(b'\t')
+            mode, obj_type, sha, size = meta.split()
+            # Submodules ('commit') and symlinks (mode 120000) are not files
+            if obj_type != b'blob' or mode == b'120000':
+                continue
+            file_path = file_path.decode('utf-8', errors='surrogateescape')
+            contents.append({
+                'type': 'file',
+                'name': file_path.rsplit('/', 1)[-1],
+                'path': file_path,
+                'sha': sha.decode('ascii'),
+                'size': int(size)
+            })
+        return contents
+
+    def get_file_content(self, username: str, repo_name: str, path: str, ref: Optional[str] = None) -> Optional[str]:
+        """Get content of a specific file."""
+        try:
+            data = self.blob_reader.read(f"{ref or self.ref}:{path}")
+        except OSError:
+            return None
+        return self._decode_content(data, path) if data is not None else None
+
+    def iter_file_contents(self, username: str, repo_name: str, paths: Iterable[str],
+                           ref: Optional[str] = None) -> Iterator[Tuple[str, Optional[str]]]:
+        """Stream decoded contents for many files through the cat-file pipe.
+
+        Paths that do not exist at the ref are not yielded.
+        """
+        # Reading by blob SHA avoids resolving every path through the tree again
+        shas = {item['path']: item['sha'] for item in self.get_repository_contents(username, repo_name, ref=ref)}
+        # Read in the order asked for, which may be a priority order
+        paths_by_sha: Dict[str, List[str]] = {}
+        for path in paths:
+            if path in shas:
+                paths_by_sha.setdefault(shas[path], []).append(path)
+        for sha, data in self.blob_reader.read_many(list(paths_by_sha)):
+            if data is not None:
+                for path in paths_by_sha[sha]:
+                    yield path, self._decode_content(data, path)
+
+    def get_contributors(self, username: str, repo_name: str) -> List[Dict[str, Any]]:
+        """Get commit authors ranked by commit count."""
+        try:
+            output = self._git_text(['shortlog', '-sne', self.ref])
+        except subprocess.CalledProcessError:
+            return []
+        contributors = []
+        for line in output.splitlines():
+            match = re.match(r'\s*(\d+)\s+(.*?)\s*(?:<(.*)>)?$', line)
+            if match:
+                contributors.append({
+                    'login': match.group(2),
+                    'email': match.group(3),
+                    'contributions': int(match.group(1))
+                })
+        return contributors
+
+    def iter_contributors(self, username: str, repo_name: str,
+                          max_items: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Stream commit authors ranked by commit count."""
+        yield from self.get_contributors(username, repo_name)[:max_items]
+
+    def get_commit_activity(self, username: str, repo_name: str) -> List[Dict[str, Any]]:
+        """Get weekly commit activity for the last year."""
+        try:
+            activity_data = self._enhance_commit_metrics(commit_activity_from_git(self.path, self.ref))
+        except subprocess.CalledProcessError:
+            return []
+        for week in activity_data:
+            week['source'] = 'local'
+        return activity_data
+
+    def get_issues(self, username: str, repo_name: str) -> List[Dict[str, Any]]:
+        """Issues live on GitHub, not in the repository."""
+        return []
+
+    def iter_issues(self, username: str, repo_name: str, state: str = 'open',
+                    max_items: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Issues live on GitHub, not in the repository."""
+        return iter(())
+
+    def get_languages(self, username: str, repo_name: str) -> Dict[str, int]:
+        """Language byte counts are computed by GitHub; not available locally."""
+        return {}
+
+    def get_head_commit(self, username: str, repo_name: str, ref: Optional[str] = None) -> Optional[str]:
+        """Get the commit SHA that ref (the service's ref by default) points to."""
+        try:
+            return self._git_text(['rev-parse', '--verify', f"{ref or self.ref}^{{commit}}"]) or None
+        except subprocess.CalledProcessError:
+            return None
+
+    def compare_commits(self, username: str, repo_name: str, base: str, head: str) -> Optional[Dict[str, Any]]:
+        """Compare two commits, shaped like GitHub's compare endpoint."""
+        try:
+            if self.get_head_commit(username, repo_name, base) == self.get_head_commit(username, repo_name, head):
+                return {'status': 'identical', 'files': []}
+            is_ancestor = subprocess.run(['git', 'merge-base', '--is-ancestor', base, head],
+                                         cwd=self.path, capture_output=True).returncode == 0
+            raw = self._git(['diff', '--raw', '-z', '-M', '--no-abbrev', base, head])
+        except subprocess.CalledProcessError:
+            return None
+
+        statuses = {'A': 'added', 'D': 'removed', 'R': 'renamed', 'C': 'copied'}
+        files = []
+        fields = raw.split(b'\0')
+        i = 0
+        while i < len(fields) - 1:
+            _, _, _, new_sha, status = fields[i].decode('ascii').split(' ', 4)
+            kind = status[0]
+            if kind in 'RC':
+                previous, filename = fields[i + 1], fields[i + 2]
+                i += 3
+            else:
+                previous, filename = None, fields[i + 1]
+                i += 2
+            change = {
+                'filename': filename.decode('utf-8', errors='surrogateescape'),
+                'status': statuses.get(kind, 'modified'),
+                'sha': new_sha
+            }
+            if kind == 'R':
+                change['previous_filename'] = previous.decode('utf-8', errors='surrogateescape')
+            files.append(change)
+        return {'status': 'ahead' if is_ancestor else 'diverged', 'files': files}
+
+    def get_blob_sizes(self, username: str, repo_name: str, ref: str, paths: Iterable[str]) -> Dict[str, int]:
+        """Map each of paths that is a file at ref to its size in bytes."""
+        paths = list(paths)
+        if not paths:
+            return {}
+        try:
+            return {item['path']: item['size'] for item in self._list_files(ref, paths)}
+        except subprocess.CalledProcessError:
+            return {}
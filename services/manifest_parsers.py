@@ -0,0 +1,197 @@
+import fnmatch
+import json
+import re
+import xml.etree.ElementTree as ET
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+# Dependency manifests, looked up by file name. Each parser takes the file's
+# content and returns the declared package names; it may raise on malformed
+# input, which parse_manifest turns into an empty list.
+
+Parser = Callable[[str], List[str]]
+
+_parsers: Dict[str, Tuple[str, Parser]] = {}
+_pattern_parsers: List[Tuple[str, str, Parser]] = []
+
+
+def register_parser(ecosystem: str, *filenames: str) -> Callable[[Parser], Parser]:
+    """Register the decorated function as the parser for these file names.
+
+    Names may be fnmatch patterns such as 'requirements*.txt'; patterns
+    with a '/' match the end of the path instead of the file name.
+    """
+    def decorator(parser: Parser) -> Parser:
+        for filename in filenames:
+            if any(char in filename for char in '*?['):
+                _pattern_parsers.append((filename, ecosystem, parser))
+            else:
+                _parsers[filename] = (ecosystem, parser)
+        return parser
+    return decorator
+
+
+def find_parser(path: str) -> Optional[Tuple[str, Parser]]:
+    """Return (ecosystem, parser) for a manifest path, or None for any other file."""
+    filename = path.rsplit('/', 1)[-1]
+    found = _parsers.get(filename)
+    if found is not None:
+        return found
+    for pattern, ecosystem, parser in _pattern_parsers:
+        if '/' in pattern:
+            matched = fnmatch.fnmatchcase(path, pattern) or fnmatch.fnmatchcase(path, '*/' + pattern)
+        else:
+            matched = fnmatch.fnmatchcase(filename, pattern)
+        if matched:
+            return ecosystem, parser
+    return None
+
+
+def is_manifest(path: str) -> bool:
+    return find_parser(path) is not None
+
+
+def parse_manifest(path: str, content: str) -> Optional[Dict[str, Any]]:
+    """Return {'ecosystem', 'dependencies'} for a manifest, or None if path is not one."""
+    found = find_parser(path)
+    if found is None:
+        return None
+    ecosystem, parser = found
+    try:
+        names = parser(content)
+    except (ValueError, TypeError, AttributeError, ET.ParseError):
+        # json.JSONDecodeError and tomllib.TOMLDecodeError are ValueErrors
+        names = []
+    return {'ecosystem': ecosystem, 'dependencies': sorted({name for name in names if name})}
+
+
+# PEP 508 requirement: the distribution name comes first
+_REQUIREMENT_NAME = re.compile(r'\s*([A-Za-z0-9][A-Za-z0-9._-]*)')
+_EGG_NAME = re.compile(r'[#&]egg=([A-Za-z0-9][A-Za-z0-9._-]*)')
+
+
+def _requirement_name(requirement: str) -> Optional[str]:
+    match = _REQUIREMENT_NAME.match(requirement)
+    return match.group(1).lower() if match else None
+
+
+@register_parser('pypi', 'requirements.txt', 'requirements*.txt', 'requirements/*.txt')
+def parse_requirements(content: str) -> List[str]:
+    names = []
+    for line in content.splitlines():
+        line = line.split(' #', 1)[0].strip()
+        if not line or line.startswith('#'):
+            continue
+        if line.startswith('-'):
+            # Options (-r, -c, --index-url ...); editable VCS installs name their egg
+            match = _EGG_NAME.search(line)
+            if match:
+                names.append(match.group(1).lower())
+            continue
+        if '://' in line and '@' not in line:
+            # A bare URL or path without a name
+            match = _EGG_NAME.search(line)
+            names.append(match.group(1).lower() if match else None)
+            continue
+        names.append(_requirement_name(line))
+    return names
+
+
+def _load_toml(content: str) -> Dict[str, Any]:
+    if tomllib is None:
+        raise ValueError('Reading TOML needs Python 3.11 or the tomli package')
+    return tomllib.loads(content)
+
+
+@register_parser('pypi', 'pyproject.toml')
+def parse_pyproject(content: str) -> List[str]:
+    data = _load_toml(content)
+    project = data.get('project', {})
+    requirements = list(project.get('dependencies', []))
+    for extra in project.get('optional-dependencies', {}).values():
+        requirements.extend(extra)
+    names = [_requirement_name(requirement) for requirement in requirements]
+
+    # Poetry keeps dependencies as tables keyed by name
+    poetry = data.get('tool', {}).get('poetry', {})
+    tables = [poetry.get('dependencies', {}), poetry.get('dev-dependencies', {})]
+    tables.extend(group.get('dependencies', {}) for group in poetry.get('group', {}).values())
+    for table in tables:
+        names.extend(name.lower() for name in table if name.lower() != 'python')
+    return names
+
+
+@register_parser('npm', 'package.json')
+def parse_package_json(content: str) -> List[str]:
+    data = json.loads(content)
+    names = []
+    for field in ('dependencies', 'devDependencies', 'peerDependencies', 'optionalDependencies'):
+        names.extend(data.get(field) or {})
+    return names
+
+
+_GO_REQUIRE = re.compile(r'^\s*(?:require\s+)?([^\s()]+)\s+v[^\s]+(.*)$')
+
+
+@register_parser('go', 'go.mod')
+def parse_go_mod(content: str) -> List[str]:
+    names = []
+    in_block = False
+    for line in content.splitlines():
+        stripped = line.strip()
+        if stripped.startswith('require ('):
+            in_block = True
+            continue
+        if in_block and stripped == ')':
+            in_block = False
+            continue
+        if not in_block and not stripped.startswith('require '):
+            continue
+        match = _GO_REQUIRE.match(stripped)
+        # Indirect requirements are dependencies of dependencies
+        if match and '// indirect' not in match.group(2):
+            names.append(match.group(1))
+    return names
+
+
+@register_parser('cargo', 'Cargo.toml')
+def parse_cargo_toml(content: str) -> List[str]:
+    data = _load_toml(content)
+    tables = [data.get(section, {}) for section in ('dependencies', 'dev-dependencies', 'build-dependencies')]
+    tables.append(data.get('workspace', {}).get('dependencies', {}))
+    for target in data.get('target', {}).values():
+        tables.extend(target.get(section, {}) for section in ('dependencies', 'dev-dependencies', 'build-dependencies'))
+    names = []
+    for table in tables:
+        for name, spec in table.items():
+            # A renamed dependency names the real crate in 'package'
+            names.append(spec.get('package', name) if isinstance(spec, dict) else name)
+    return names
+
+
+@register_parser('maven', 'pom.xml')
+def parse_pom_xml(content: str) -> List[str]:
+    root = ET.fromstring(content)
+    names = []
+    # '{*}' matches the POM namespace, whichever version it is
+    for dependency in root.findall('.//{*}dependency'):
+        group = dependency.findtext('{*}groupId', '').strip()
+        artifact = dependency.findtext('{*}artifactId', '').strip()
+        if artifact:
+            names.append(f"{group}:{artifact}" if group else artifact)
+    return names
+
+
+_GEM = re.compile(r'''^\s*gem\s*\(?\s*['"]([^'"]+)['"]''', re.MULTILINE)
+
+
+@register_parser('rubygems', 'Gemfile')
+def parse_gemfile(content: str) -> List[str]:
+    return _GEM.findall(content)
@@ -0,0 +1,147 @@
+import ast
+import re
+import time
+import warnings
+from typing import Any, Dict, List, Optional, Set
+
+# Nodes that add a decision point to the enclosing function's cyclomatic complexity
+_BRANCHES = {ast.If, ast.IfExp, ast.For, ast.AsyncFor, ast.While, ast.ExceptHandler,
+             ast.Assert, ast.comprehension}
+if hasattr(ast, 'match_case'):
+    _BRANCHES.add(ast.match_case)
+_FUNCTIONS = {ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda}
+_ASYNC = {ast.AsyncFunctionDef, ast.Await, ast.AsyncWith, ast.AsyncFor}
+
+# Imports that imply an architecture tag
+WEB_MODULES = {'flask', 'django', 'fastapi', 'aiohttp', 'tornado', 'starlette', 'bottle', 'pyramid'}
+ML_MODULES = {'tensorflow', 'torch', 'keras', 'sklearn', 'jax', 'transformers', 'xgboost', 'lightgbm'}
+
+# Regex estimate of decision points for files the parser cannot handle
+_DECISION_PATTERN = re.compile(r'\b(?:if|elif|for|while|except|and|or|assert|case)\b')
+_FUNCTION_PATTERN = re.compile(r'^\s*(?:async\s+)?def\s+\w+', re.MULTILINE)
+
+
+class BudgetExceeded(Exception):
+    """Raised when analyzing a file takes longer than its time budget."""
+
+
+class _ComplexityVisitor:
+    """Walk a module once, collecting imports, definitions and McCabe complexity."""
+
+    # Check the clock every this many nodes
+    CLOCK_INTERVAL = 2048
+
+    def __init__(self, deadline: float):
+        self.deadline = deadline
+        self.imports: Set[str] = set()
+        self.functions = 0
+        self.classes = 0
+        self.is_async = False
+        # Complexity of every function and lambda, and of the module-level code
+        self.function_blocks: List[int] = []
+        self.module_block = 0
+        self._nodes = 0
+
+    def visit_module(self, tree: ast.Module) -> None:
+        self.module_block = self._walk_block(tree.body)
+
+    def _walk_block(self, nodes: List[ast.AST]) -> int:
+        """Return the complexity of one block; nested functions become blocks of their own."""
+        complexity = 1
+        # Visiting order does not matter for any of the counts
+        stack = list(nodes)
+        while stack:
+            node = stack.pop()
+            self._nodes += 1
+            if self._nodes % self.CLOCK_INTERVAL == 0 and time.monotonic() > self.deadline:
+                raise BudgetExceeded()
+
+            kind = type(node)
+            if kind in _ASYNC:
+                self.is_async = True
+            if kind in _FUNCTIONS:
+                if kind is not ast.Lambda:
+                    self.functions += 1
+                    # Decorators run in the enclosing block
+                    stack.extend(node.decorator_list)
+                body = node.body if kind is not ast.Lambda else [node.body]
+                self.function_blocks.append(self._walk_block(body))
+                continue
+            if kind in _BRANCHES:
+                complexity += 1
+                if kind is ast.comprehension:
+                    complexity += len(node.ifs)
+            elif kind is ast.BoolOp:
+                complexity += len(node.values) - 1
+            elif kind is ast.ClassDef:
+                self.classes += 1
+            elif kind is ast.Import:
+                self.imports.update(alias.name.split('.')[0] for alias in node.names)
+            elif kind is ast.ImportFrom:
+                # Relative imports are the repository's own modules
+                if node.level == 0 and node.module:
+                    self.imports.add(node.module.split('.')[0])
+            stack.extend(ast.iter_child_nodes(node))
+        return complexity
+
+
+def analyze_python(content: str, max_bytes: int, max_seconds: float) -> Optional[Dict[str, Any]]:
+    """Analyze Python source with the ast module.
+
+    Returns the imported top-level modules, function and class counts,
+    cyclomatic complexity (the total over all blocks and the largest
+    single function) and whether the code is asynchronous. Returns None
+    when the file is larger than max_bytes, does not parse, or takes
+    longer than max_seconds, so the caller can fall back to regexes.
+    """
+    if len(content) > max_bytes:
+        return None
+    deadline = time.monotonic() + max_seconds
+    try:
+        with warnings.catch_warnings():
+            # Invalid escape sequences and the like are not worth a warning per file
+            warnings.simplefilter('ignore')
+            tree = ast.parse(content)
+        # Parsing cannot be interrupted; skip the walk if it already used the budget
+        if time.monotonic() > deadline:
+            return None
+        visitor = _ComplexityVisitor(deadline)
+        visitor.visit_module(tree)
+    except (SyntaxError, ValueError, RecursionError, MemoryError, BudgetExceeded):
+        return None
+
+    visitor.imports.discard('__future__')
+    return {
+        'dependencies': visitor.imports,
+        'functions': visitor.functions,
+        'classes': visitor.classes,
+        'cyclomatic': visitor.module_block + sum(visitor.function_blocks),
+        'max_cyclomatic': max(visitor.function_blocks, default=0),
+        'is_async': visitor.is_async
+    }
+
+
+def architecture_tags(facts: Dict[str, Any]) -> List[str]:
+    """Architecture tags for analyzed Python, in the same order as the regex detector."""
+    tags = []
+    if facts['classes']:
+        tags.append('Object-Oriented')
+    if facts['functions'] and not facts['classes']:
+        tags.append('Functional')
+    if facts['is_async']:
+        tags.append('Asynchronous')
+    if facts['dependencies'] & WEB_MODULES:
+        tags.append('Web Application')
+    if facts['dependencies'] & ML_MODULES:
+        tags.append('Machine Learning')
+    return tags
+
+
+def estimate_complexity(content: str) -> Dict[str, Any]:
+    """Rough total cyclomatic complexity from keyword counts, for files ast cannot handle.
+
+    The per-function maximum is unknown without a parse and is None.
+    """
+    functions = len(_FUNCTION_PATTERN.findall(content))
+    decisions = len(_DECISION_PATTERN.findall(content))
+    return {'cyclomatic': functions + 1 + decisions, 'max_cyclomatic': None}
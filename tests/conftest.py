@@ -0,0 +1,93 @@
+import base64
+import io
+import json
+import tarfile
+from collections import Counter
+from typing import Any, Callable, Dict, Optional
+
+import pytest
+import requests
+
+API = 'https://api.github.com'
+HEAD_SHA = 'a' * 40
+
+
+def make_response(status: int, body: Any = None, raw: Optional[bytes] = None,
+                  headers: Optional[Dict[str, str]] = None) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    if raw is not None:
+        response.raw = io.BytesIO(raw)
+    elif isinstance(body, str):
+        response._content = body.encode('utf-8')
+    else:
+        response._content = json.dumps(body).encode('utf-8')
+    return response
+
+
+def make_tarball(files: Dict[str, bytes], prefix: str = 'octo-demo-aaaaaaa/') -> bytes:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode='w:gz') as tar:
+        for name, data in files.items():
+            info = tarfile.TarInfo(prefix + name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+class GitHubStub:
+    """Answers GitHub API requests for octo/demo from an in-memory file tree.
+
+    Every request is counted by (method, path); routes can be overridden
+    or added per test.
+    """
+
+    def __init__(self, files: Dict[str, bytes]):
+        self.files = files
+        self.calls: Counter = Counter()
+        self.routes: Dict[str, Callable[..., requests.Response]] = {}
+
+    def request(self, method: str, url: str, params=None, json=None, **kwargs) -> requests.Response:
+        path = url[len(API):]
+        self.calls[(method, path)] += 1
+        if path in self.routes:
+            return self.routes[path](params=params, json=json)
+        repo = '/repos/octo/demo'
+        if path == repo:
+            return make_response(200, {'name': 'demo', 'full_name': 'octo/demo', 'default_branch': 'main'})
+        if path.startswith(f'{repo}/commits/'):
+            return make_response(200, HEAD_SHA)
+        if path.startswith(f'{repo}/git/trees/'):
+            return make_response(200, {'truncated': False, 'tree': [
+                {'path': name, 'type': 'blob', 'mode': '100644', 'sha': f'sha-{name}', 'size': len(data)}
+                for name, data in self.files.items()]})
+        if path.startswith(f'{repo}/tarball'):
+            return make_response(200, raw=make_tarball(self.files))
+        if path.startswith(f'{repo}/contents/'):
+            name = path[len(f'{repo}/contents/'):]
+            if name in self.files:
+                return make_response(200, {'type': 'file', 'path': name,
+                                           'content': base64.b64encode(self.files[name]).decode('ascii')})
+        return make_response(404, {'message': 'Not Found'})
+
+    def count(self, fragment: str) -> int:
+        return sum(n for (_, path), n in self.calls.items() if fragment in path)
+
+
+@pytest.fixture
+def github_env(monkeypatch):
+    """Keep the services off the network and off the on-disk caches."""
+    monkeypatch.setenv('GITHUB_TOKEN', 'test-token')
+    monkeypatch.setenv('GITHUB_CACHE_ENABLED', 'false')
+    monkeypatch.setenv('ANALYSIS_CACHE_ENABLED', 'false')
+    monkeypatch.setenv('GITHUB_CONTENT_SOURCE', 'api')
+    monkeypatch.setenv('GEMINI_API_KEY', 'test-key')
+
+
+@pytest.fixture
+def github_stub(github_env, monkeypatch):
+    stub = GitHubStub({})
+    monkeypatch.setattr(requests.Session, 'request',
+                        lambda session, method, url, **kwargs: stub.request(method, url, **kwargs))
+    return stub
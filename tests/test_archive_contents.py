@@ -0,0 +1,57 @@
+import pytest
+
+from services.analysis_service import AnalysisService
+from services.github_service import GitHubService
+from tests.conftest import HEAD_SHA
+
+FILES = {
+    'app.py': b'import os\nfrom flask import Flask\n\napp = Flask(__name__)\n',
+    'pkg/__init__.py': b'',
+    'pkg/models.py': b'import json\n\nclass User:\n    def to_dict(self):\n        return {}\n',
+    'web/index.js': b"const express = require('express');\nfunction start() {}\n",
+    'logo.png': b'\x89PNG\r\n\x1a\n\x00\x00',
+    'README.md': b'# Demo\n',
+}
+
+
+@pytest.fixture
+def stub(github_stub):
+    github_stub.files.update(FILES)
+    return github_stub
+
+
+def test_tarball_matches_per_file_contents(stub):
+    github = GitHubService()
+    paths = ['app.py', 'pkg/models.py', 'logo.png', 'missing.py']
+    archived = dict(github.iter_file_contents('octo', 'demo', paths, ref=HEAD_SHA))
+
+    assert stub.count('/tarball/' + HEAD_SHA) == 1
+    # Paths the archive does not carry are left for the caller to fetch
+    assert set(archived) == {'app.py', 'pkg/models.py', 'logo.png'}
+    for path in archived:
+        assert archived[path] == github.get_file_content('octo', 'demo', path, ref=HEAD_SHA)
+    assert archived['logo.png'] is None
+
+
+def analyze(use_archive: bool):
+    service = AnalysisService()
+    service.archive_threshold = 1 if use_archive else 0
+    service.archive_min_share = 0.0
+    listing = service.github_service.get_repository_contents('octo', 'demo', ref=HEAD_SHA)
+    return service._analyze_code_files('octo', 'demo', listing)
+
+
+def test_archive_analysis_matches_per_file_analysis(stub):
+    per_file = analyze(use_archive=False)
+    assert stub.count('/tarball') == 0
+    assert stub.count('/contents/') > 0
+
+    stub.calls.clear()
+    archived = analyze(use_archive=True)
+    assert stub.count('/tarball') == 1
+    assert stub.count('/contents/') == 0
+
+    for key in ('dependencies', 'main_files'):
+        per_file[key] = sorted(per_file[key])
+        archived[key] = sorted(archived[key])
+    assert archived == per_file
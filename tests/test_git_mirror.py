@@ -0,0 +1,79 @@
+import os
+import subprocess
+
+import pytest
+
+from services.git_mirror import GitMirrorCache
+
+
+def git(cwd, *args):
+    return subprocess.run(['git', *args], cwd=cwd, check=True, capture_output=True).stdout.decode().strip()
+
+
+def commit(origin, path, text):
+    with open(os.path.join(origin, path), 'w') as f:
+        f.write(text)
+    git(origin, 'add', path)
+    git(origin, '-c', 'user.name=test', '-c', 'user.email=test@example.com', 'commit', '-q', '-m', path)
+    return git(origin, 'rev-parse', 'HEAD')
+
+
+@pytest.fixture
+def origin(tmp_path):
+    path = tmp_path / 'origin' / 'octo' / 'demo'
+    path.mkdir(parents=True)
+    git(path, 'init', '-q')
+    git(path, 'config', 'uploadpack.allowFilter', 'true')
+    commit(path, 'README.md', 'hello\n')
+    return path
+
+
+def make_mirror(tmp_path, fetch_interval=300.0):
+    return GitMirrorCache(str(tmp_path / 'mirrors'), max_bytes=1 << 30, max_age=3600,
+                          fetch_interval=fetch_interval,
+                          url_template='file://' + str(tmp_path / 'origin') + '/{owner}/{repo}')
+
+
+def test_clone_then_read_blobs(tmp_path, origin):
+    mirror = make_mirror(tmp_path)
+    with mirror.open('octo', 'demo') as path:
+        shas = mirror.blob_shas(path, ['README.md', 'missing.txt'])
+        assert list(shas) == ['README.md']
+        assert mirror.blob_reader('octo', 'demo').read(shas['README.md']) == b'hello\n'
+    assert mirror.stats()['clones'] == 1
+
+
+def test_open_fetches_new_commits_after_interval(tmp_path, origin):
+    mirror = make_mirror(tmp_path, fetch_interval=0)
+    with mirror.open('octo', 'demo'):
+        pass
+    head = commit(origin, 'app.py', 'print(1)\n')
+    with mirror.open('octo', 'demo') as path:
+        assert 'app.py' in mirror.blob_shas(path, ['app.py'], head)
+    assert mirror.stats()['fetches'] == 1
+
+
+def test_ensure_commit_fetches_missing_commit(tmp_path, origin):
+    mirror = make_mirror(tmp_path)
+    with mirror.open('octo', 'demo'):
+        pass
+    head = commit(origin, 'app.py', 'print(2)\n')
+    with mirror.open('octo', 'demo') as path:
+        mirror.ensure_commit(path, head)
+        assert 'app.py' in mirror.blob_shas(path, ['app.py'], head)
+        with pytest.raises(subprocess.CalledProcessError):
+            mirror.ensure_commit(path, '0' * 40)
+
+
+def test_evict_runs_only_after_the_mirror_grew(tmp_path, origin, monkeypatch):
+    mirror = make_mirror(tmp_path)
+    calls = []
+    evict = mirror.evict
+    monkeypatch.setattr(mirror, 'evict', lambda: calls.append(1) or evict())
+    with mirror.open('octo', 'demo'):
+        pass
+    assert calls == [1]
+    for _ in range(3):
+        with mirror.open('octo', 'demo'):
+            pass
+    assert calls == [1]
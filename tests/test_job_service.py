@@ -0,0 +1,87 @@
+import sqlite3
+import threading
+import time
+
+from services.job_service import JobService
+
+
+class BlockingAnalysis:
+    """Stands in for AnalysisService; every call waits until released."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.calls = []
+
+    def _run(self, name, *args):
+        self.calls.append(name)
+        self.release.wait(5)
+        return {'name': name}
+
+    def generate_readme(self, username, repo_name):
+        return self._run('generate_readme')
+
+    def get_full_analysis(self, username, repo_name, base_sha=None, progress=None):
+        return self._run('get_full_analysis', base_sha)
+
+
+def wait_until_finished(jobs, job_id):
+    for _ in range(500):
+        job = jobs.get(job_id)
+        if job['status'] in ('completed', 'failed'):
+            return job
+        time.sleep(0.01)
+    raise AssertionError('job did not finish')
+
+
+def test_submit_ignores_arguments_the_action_does_not_use(tmp_path):
+    analysis = BlockingAnalysis()
+    jobs = JobService(analysis, db_path=str(tmp_path / 'jobs.sqlite3'))
+    readme = jobs.submit('Octo', 'Demo', 'generate_readme', view_type='repo')
+    assert jobs.submit('octo', 'demo', 'generate_readme', view_type='developer', base_sha='abc') == readme
+    full = jobs.submit('octo', 'demo', 'complete_analysis', base_sha='abc')
+    assert full != readme
+    assert jobs.submit('octo', 'demo', 'complete_analysis', base_sha='def') != full
+
+    analysis.release.set()
+    assert wait_until_finished(jobs, readme)['result'] == {'name': 'generate_readme'}
+    assert analysis.calls.count('generate_readme') == 1
+
+
+def test_startup_fails_only_jobs_with_an_expired_lease(tmp_path, monkeypatch):
+    monkeypatch.setenv('JOB_LEASE_SECONDS', '60')
+    db_path = str(tmp_path / 'jobs.sqlite3')
+    analysis = BlockingAnalysis()
+    running = JobService(analysis, db_path=db_path)
+    live = running.submit('octo', 'demo', 'generate_readme')
+
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            "INSERT INTO jobs (id, username, repo_name, action, status, created_at, updated_at, owner, heartbeat_at) "
+            "VALUES ('dead', 'octo', 'other', 'generate_readme', 'running', 0, 0, 'gone', 0)"
+        )
+
+    # Another process sharing the database starts up
+    restarted = JobService(BlockingAnalysis(), db_path=db_path)
+    assert restarted.get('dead')['status'] == 'failed'
+    assert restarted.get(live)['status'] in ('queued', 'running')
+
+    analysis.release.set()
+    assert wait_until_finished(running, live)['status'] == 'completed'
+
+
+def test_tables_from_before_leases_are_migrated(tmp_path):
+    db_path = str(tmp_path / 'jobs.sqlite3')
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            "CREATE TABLE jobs (id TEXT PRIMARY KEY, username TEXT NOT NULL, repo_name TEXT NOT NULL, "
+            "action TEXT NOT NULL, view_type TEXT, base_sha TEXT, status TEXT NOT NULL, progress TEXT, "
+            "result TEXT, error TEXT, created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        conn.execute("INSERT INTO jobs (id, username, repo_name, action, status, created_at, updated_at) "
+                     "VALUES ('old', 'octo', 'demo', 'generate_readme', 'running', 0, 0)")
+
+    analysis = BlockingAnalysis()
+    analysis.release.set()
+    jobs = JobService(analysis, db_path=db_path)
+    assert jobs.get('old')['status'] == 'failed'
+    assert wait_until_finished(jobs, jobs.submit('octo', 'demo', 'generate_readme'))['status'] == 'completed'
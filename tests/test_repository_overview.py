@@ -0,0 +1,82 @@
+import base64
+
+import pytest
+
+from services.github_service import GitHubService
+from tests.conftest import HEAD_SHA, make_response
+
+README = '# Demo\n'
+LANGUAGES = {'Python': 1200, 'JavaScript': 300}
+ISSUES = [
+    {'number': 7, 'title': 'Crash on start', 'state': 'open',
+     'created_at': '2024-03-02T10:00:00Z', 'html_url': 'https://github.com/octo/demo/issues/7'},
+    {'number': 5, 'title': 'Typo in docs', 'state': 'open',
+     'created_at': '2024-02-01T09:30:00Z', 'html_url': 'https://github.com/octo/demo/issues/5'},
+]
+PULL_REQUEST = {'number': 6, 'title': 'Fix crash', 'state': 'open',
+                'created_at': '2024-03-01T08:00:00Z', 'html_url': 'https://github.com/octo/demo/pull/6',
+                'pull_request': {'url': 'https://api.github.com/repos/octo/demo/pulls/6'}}
+REPOSITORY = {
+    'name': 'demo', 'full_name': 'octo/demo', 'description': 'A demo repository',
+    'html_url': 'https://github.com/octo/demo', 'clone_url': 'https://github.com/octo/demo.git',
+    'stargazers_count': 42, 'watchers_count': 42, 'subscribers_count': 3, 'forks_count': 4,
+    # REST counts open pull requests as issues
+    'open_issues_count': len(ISSUES) + 1,
+    'language': 'Python', 'default_branch': 'main',
+    'created_at': '2020-01-01T00:00:00Z', 'updated_at': '2024-03-02T00:00:00Z',
+    'pushed_at': '2024-03-02T00:00:00Z',
+}
+
+
+def graphql_response(**_):
+    return make_response(200, {'data': {'repository': {
+        'name': 'demo', 'nameWithOwner': 'octo/demo', 'description': REPOSITORY['description'],
+        'url': REPOSITORY['html_url'], 'stargazerCount': 42, 'forkCount': 4,
+        'watchers': {'totalCount': 3}, 'primaryLanguage': {'name': 'Python'},
+        'createdAt': REPOSITORY['created_at'], 'updatedAt': REPOSITORY['updated_at'],
+        'pushedAt': REPOSITORY['pushed_at'],
+        'defaultBranchRef': {'name': 'main', 'target': {'oid': HEAD_SHA}},
+        'openIssueCount': {'totalCount': len(ISSUES)},
+        'openPullRequestCount': {'totalCount': 1},
+        'openIssues': {'nodes': [{'number': issue['number'], 'title': issue['title'], 'state': 'OPEN',
+                                  'createdAt': issue['created_at'], 'url': issue['html_url']}
+                                 for issue in ISSUES]},
+        'languages': {'edges': [{'size': size, 'node': {'name': name}} for name, size in LANGUAGES.items()]},
+        'readme0': {'text': README}, 'readme1': None, 'readme2': None, 'readme3': None,
+    }}})
+
+
+@pytest.fixture
+def stub(github_stub):
+    github_stub.routes.update({
+        '/graphql': graphql_response,
+        '/repos/octo/demo': lambda **_: make_response(200, REPOSITORY),
+        # Newest first, with a pull request in between like the REST endpoint returns them
+        '/repos/octo/demo/issues': lambda **_: make_response(200, [ISSUES[0], PULL_REQUEST, ISSUES[1]]),
+        '/repos/octo/demo/languages': lambda **_: make_response(200, LANGUAGES),
+        '/repos/octo/demo/readme': lambda **_: make_response(
+            200, {'content': base64.b64encode(README.encode('utf-8')).decode('ascii')}),
+    })
+    return github_stub
+
+
+def test_overview_matches_rest(stub):
+    github = GitHubService()
+    overview = github.get_repository_overview('octo', 'demo')
+    assert stub.calls[('POST', '/graphql')] == 1
+
+    rest = github.get_repository('octo', 'demo')
+    for field, value in overview['repository'].items():
+        assert value == rest[field], field
+    assert overview['readme'] == github.get_readme('octo', 'demo')
+    assert overview['languages'] == github.get_languages('octo', 'demo')
+    assert overview['head_commit'] == github.get_head_commit('octo', 'demo')
+
+
+def test_issues_exclude_pull_requests_like_graphql(stub):
+    github = GitHubService()
+    overview = github.get_repository_overview('octo', 'demo')
+    fields = ['number', 'title', 'state', 'created_at', 'html_url']
+    rest = [{field: issue[field] for field in fields} for issue in github.get_issues('octo', 'demo')]
+    assert overview['issues_complete']
+    assert overview['issues'] == rest == ISSUES
@@ -0,0 +1,106 @@
+import json
+import threading
+import zlib
+from typing import Any, Dict, Optional, Tuple
+
+from utils.disk_cache import DiskCache, shared_disk_cache
+
+
+class BlobCache:
+    """Content-addressed store keyed by git blob SHA.
+
+    Holds decoded file contents and the per-file analysis computed from
+    them, so unchanged files are neither refetched nor re-analyzed.
+    """
+
+    def __init__(self, store: DiskCache):
+        self.store = store
+        self._lock = threading.Lock()
+        self._counters = {'content_hits': 0, 'analysis_hits': 0, 'misses': 0}
+
+    def get_content(self, sha: str) -> Optional[str]:
+        """Return the decoded content of a blob, or None if it is not cached."""
+        raw = self.store.get(f"blob:{sha}")
+        if raw is None:
+            return None
+        try:
+            content = zlib.decompress(raw).decode('utf-8')
+        except (zlib.error, UnicodeDecodeError):
+            return None
+        self._count('content_hits')
+        return content
+
+    def put_content(self, sha: str, content: str) -> None:
+        self.store.set(f"blob:{sha}", zlib.compress(content.encode('utf-8')))
+
+    def get_analysis(self, sha: str, path: str, version: int) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """Return (found, result) for a file's cached analysis.
+
+        A cached result may itself be None, e.g. for binary files.
+        """
+        raw = self.store.get(self._analysis_key(sha, path, version))
+        if raw is None:
+            self._count('misses')
+            return False, None
+        try:
+            result = json.loads(zlib.decompress(raw).decode('utf-8'))
+        except (zlib.error, ValueError):
+            self._count('misses')
+            return False, None
+        self._count('analysis_hits')
+        return True, result
+
+    def put_analysis(self, sha: str, path: str, version: int, result: Optional[Dict[str, Any]]) -> None:
+        payload = json.dumps(result).encode('utf-8')
+        self.store.set(self._analysis_key(sha, path, version), zlib.compress(payload))
+
+    def get_snapshot(self, owner: str, repo: str, commit_sha: str, version: int) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Return the file listing and per-file results stored for a commit, keyed by path."""
+        raw = self.store.get(self._snapshot_key(owner, repo, commit_sha, version))
+        if raw is None:
+            return None
+        try:
+            return json.loads(zlib.decompress(raw).decode('utf-8'))
+        except (zlib.error, ValueError):
+            return None
+
+    def put_snapshot(self, owner: str, repo: str, commit_sha: str, version: int,
+                     files: Dict[str, Dict[str, Any]]) -> None:
+        """Store {path: {'sha': blob_sha, 'size': ..., 'result': ...}} for a commit.
+
+        'result' is absent for files that were listed but not analyzed.
+        """
+        payload = json.dumps(files).encode('utf-8')
+        self.store.set(self._snapshot_key(owner, repo, commit_sha, version), zlib.compress(payload))
+
+    def _snapshot_key(self, owner: str, repo: str, commit_sha: str, version: int) -> str:
+        return f"snapshot:v{version}:{owner.lower()}/{repo.lower()}@{commit_sha}"
+
+    def _analysis_key(self, sha: str, path: str, version: int) -> str:
+        # The path is part of the key because language and main-file detection use it
+        return f"analysis:v{version}:{sha}:{path}"
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+        counters.update(self.store.stats())
+        return counters
+
+
+_caches: Dict[str, BlobCache] = {}
+_caches_lock = threading.Lock()
+
+
+def shared_blob_cache(directory: str, max_bytes: int) -> BlobCache:
+    """Return the process-wide blob cache stored in directory."""
+    store = shared_disk_cache(directory, max_bytes)
+    with _caches_lock:
+        cache = _caches.get(store.directory)
+        if cache is None:
+            cache = BlobCache(store)
+            _caches[store.directory] = cache
+        return cache
@@ -0,0 +1,9 @@
+import contextvars
+from concurrent.futures import Executor, Future
+from typing import Any, Callable
+
+
+def submit_with_context(executor: Executor, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+    """Submit a task that runs inside a copy of the caller's context variables."""
+    context = contextvars.copy_context()
+    return executor.submit(context.run, fn, *args, **kwargs)
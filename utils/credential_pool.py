@@ -0,0 +1,74 @@
+import hashlib
+import itertools
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+from utils.rate_limiter import GitHubRateLimiter, get_rate_limiter
+
+
+class Credential:
+    """A GitHub token together with its process-wide rate limiter."""
+
+    def __init__(self, token: Optional[str]):
+        self.token = token
+        self.key = credential_key(token)
+        self.limiter: GitHubRateLimiter = get_rate_limiter(self.key)
+
+    def auth_headers(self) -> Dict[str, str]:
+        return {'Authorization': f'token {self.token}'} if self.token else {}
+
+
+class CredentialPool:
+    """Route each GitHub request to the token with the most quota left."""
+
+    def __init__(self, tokens: List[Optional[str]]):
+        unique = list(dict.fromkeys(t for t in tokens if t)) or [None]
+        self.credentials = [Credential(token) for token in unique]
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def acquire(self, exclude: Optional[List[Credential]] = None) -> Optional[Credential]:
+        """Reserve one request on the credential with the most headroom.
+
+        Returns None if every credential has reached its reserve.
+        """
+        candidates = [c for c in self.credentials if not exclude or c not in exclude]
+        if not candidates:
+            return None
+        with self._lock:
+            # Rotate so credentials with equal headroom take turns
+            offset = next(self._counter) % len(candidates)
+        candidates = candidates[offset:] + candidates[:offset]
+        candidates.sort(key=lambda c: c.limiter.headroom(), reverse=True)
+        for credential in candidates:
+            if credential.limiter.acquire():
+                return credential
+        return None
+
+    def has_quota(self) -> bool:
+        return any(c.limiter.has_quota() for c in self.credentials)
+
+    def seconds_until_available(self) -> float:
+        """Seconds until at least one credential has quota again."""
+        if self.has_quota():
+            return 0.0
+        return min(c.limiter.seconds_until_reset() for c in self.credentials)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [dict(credential=c.key, **c.limiter.stats()) for c in self.credentials]
+
+
+def credential_key(token: Optional[str]) -> str:
+    """Identify a credential without keeping the token itself."""
+    if not token:
+        return 'anonymous'
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()[:16]
+
+
+def tokens_from_env() -> List[str]:
+    """Tokens from GITHUB_TOKENS (comma separated) followed by GITHUB_TOKEN."""
+    tokens = [t.strip() for t in os.getenv('GITHUB_TOKENS', '').split(',') if t.strip()]
+    if os.getenv('GITHUB_TOKEN'):
+        tokens.append(os.getenv('GITHUB_TOKEN'))
+    return tokens
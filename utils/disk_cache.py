@@ -0,0 +1,125 @@
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+_caches: Dict[str, 'DiskCache'] = {}
+_caches_lock = threading.Lock()
+
+
+class DiskCache:
+    """Size-bounded key/value store on disk with least-recently-used eviction.
+
+    Keys are hashed into file names, so any string can be used as a key.
+    Recency is tracked in memory and seeded from file modification times.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._sizes: 'OrderedDict[str, int]' = OrderedDict()
+        self._total_bytes = 0
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self) -> None:
+        """Rebuild the recency index from the files already on disk."""
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.startswith('.tmp'):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(root, name))
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, name, stat.st_size))
+        for _, name, size in sorted(entries):
+            self._sizes[name] = size
+            self._total_bytes += size
+
+    def _digest(self, key: str) -> str:
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.directory, digest[:2], digest)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the stored value for key, or None if it is not cached."""
+        digest = self._digest(key)
+        path = self._path(digest)
+        try:
+            with open(path, 'rb') as f:
+                value = f.read()
+            os.utime(path)
+        except OSError:
+            return None
+        with self._lock:
+            if digest in self._sizes:
+                self._sizes.move_to_end(digest)
+        return value
+
+    def set(self, key: str, value: bytes) -> None:
+        """Store value under key, evicting least recently used entries if needed."""
+        if len(value) > self.max_bytes:
+            return
+        digest = self._digest(key)
+        path = self._path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file first so readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(value)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+
+        with self._lock:
+            self._total_bytes += len(value) - self._sizes.pop(digest, 0)
+            self._sizes[digest] = len(value)
+            self._evict()
+
+    def delete(self, key: str) -> None:
+        """Remove key from the cache if present."""
+        digest = self._digest(key)
+        with self._lock:
+            self._total_bytes -= self._sizes.pop(digest, 0)
+        try:
+            os.remove(self._path(digest))
+        except OSError:
+            pass
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until the cache fits its budget."""
+        while self._total_bytes > self.max_bytes and self._sizes:
+            digest, size = self._sizes.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                os.remove(self._path(digest))
+            except OSError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'entries': len(self._sizes),
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes
+            }
+
+
+def shared_disk_cache(directory: str, max_bytes: int) -> DiskCache:
+    """Return the process-wide DiskCache for directory, creating it on first use."""
+    directory = os.path.abspath(directory)
+    with _caches_lock:
+        cache = _caches.get(directory)
+        if cache is None:
+            cache = DiskCache(directory, max_bytes)
+            _caches[directory] = cache
+        return cache
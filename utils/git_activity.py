@@ -0,0 +1,44 @@
+import subprocess
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+DAY = 24 * 3600
+WEEK = 7 * DAY
+
+
+def week_start(timestamp: float) -> int:
+    """Unix time of the Sunday 00:00 UTC that starts the week containing timestamp."""
+    day = int(timestamp) // DAY
+    # 1970-01-01 was a Thursday, so day 3 is the first Sunday
+    return (day - (day - 3) % 7) * DAY
+
+
+def commit_histogram(timestamps: np.ndarray, weeks: int = 52, now: Optional[float] = None) -> List[Dict[str, Any]]:
+    """Bucket commit timestamps into the last `weeks` weeks, Sunday first.
+
+    Returns entries shaped like GitHub's stats/commit_activity:
+    {'week': <week start>, 'total': <commits>, 'days': [<7 daily counts>]}.
+    """
+    first_week = week_start(time.time() if now is None else now) - (weeks - 1) * WEEK
+    day_index = (timestamps.astype(np.int64) - first_week) // DAY
+    day_index = day_index[(day_index >= 0) & (day_index < weeks * 7)]
+    counts = np.bincount(day_index, minlength=weeks * 7).reshape(weeks, 7)
+    return [
+        {'week': first_week + i * WEEK, 'total': int(row.sum()), 'days': row.tolist()}
+        for i, row in enumerate(counts)
+    ]
+
+
+def commit_activity_from_git(repo_path: str, ref: str = 'HEAD', weeks: int = 52,
+                             now: Optional[float] = None) -> List[Dict[str, Any]]:
+    """Weekly commit activity of ref from a single `git log` pass over a local repository."""
+    now = time.time() if now is None else now
+    since = week_start(now) - (weeks - 1) * WEEK
+    output = subprocess.run(
+        ['git', 'log', ref, f'--since={since}', '--format=%ct'],
+        cwd=repo_path, check=True, capture_output=True
+    ).stdout
+    timestamps = np.array(output.split(), dtype=np.int64)
+    return commit_histogram(timestamps, weeks=weeks, now=now)
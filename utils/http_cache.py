@@ -0,0 +1,105 @@
+import json
+import threading
+from typing import Any, Dict, Mapping, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from utils.disk_cache import DiskCache, shared_disk_cache
+
+# Response headers worth keeping alongside the cached body
+STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Link')
+
+
+class HTTPResponseCache:
+    """ETag/Last-Modified revalidation cache for GET responses backed by a DiskCache.
+
+    Each entry is a JSON metadata line followed by the raw response body.
+    """
+
+    def __init__(self, store: DiskCache):
+        self.store = store
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'stores': 0}
+
+    def key(self, url: str, params: Optional[Mapping[str, Any]] = None,
+            headers: Optional[Mapping[str, str]] = None) -> str:
+        """Build a cache key from the full request URL and its Accept header."""
+        prepared_url = requests.Request('GET', url, params=params).prepare().url
+        accept = (headers or {}).get('Accept', '')
+        return f"{prepared_url}\n{accept}"
+
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached entry for key as {'headers': ..., 'body': ...}."""
+        raw = self.store.get(key)
+        if raw is None:
+            return None
+        meta, _, body = raw.partition(b'\n')
+        try:
+            headers = json.loads(meta.decode('utf-8'))
+        except ValueError:
+            self.store.delete(key)
+            return None
+        return {'headers': headers, 'body': body}
+
+    def conditional_headers(self, entry: Dict[str, Any]) -> Dict[str, str]:
+        """Validators to send so GitHub can answer 304 Not Modified."""
+        headers = {}
+        if entry['headers'].get('ETag'):
+            headers['If-None-Match'] = entry['headers']['ETag']
+        if entry['headers'].get('Last-Modified'):
+            headers['If-Modified-Since'] = entry['headers']['Last-Modified']
+        return headers
+
+    def store_response(self, key: str, response: requests.Response) -> None:
+        """Cache a 200 response if it carries a validator."""
+        if response.status_code != 200:
+            return
+        if not (response.headers.get('ETag') or response.headers.get('Last-Modified')):
+            return
+        headers = {name: response.headers[name] for name in STORED_HEADERS if name in response.headers}
+        self.store.set(key, json.dumps(headers).encode('utf-8') + b'\n' + response.content)
+        self._count('stores')
+
+    def revalidated_response(self, entry: Dict[str, Any], not_modified: requests.Response) -> requests.Response:
+        """Rebuild a 200 response from a cached entry after a 304 revalidation."""
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = 'OK'
+        response._content = entry['body']
+        # Fresh headers (rate limit counters etc.) win over the stored ones
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response.headers.update(not_modified.headers)
+        response.url = not_modified.url
+        response.request = not_modified.request
+        response.encoding = 'utf-8'
+        self._count('hits')
+        return response
+
+    def record_miss(self) -> None:
+        self._count('misses')
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+        counters.update(self.store.stats())
+        return counters
+
+
+_caches: Dict[str, HTTPResponseCache] = {}
+_caches_lock = threading.Lock()
+
+
+def shared_response_cache(directory: str, max_bytes: int) -> HTTPResponseCache:
+    """Return the process-wide response cache stored in directory."""
+    store = shared_disk_cache(directory, max_bytes)
+    with _caches_lock:
+        cache = _caches.get(store.directory)
+        if cache is None:
+            cache = HTTPResponseCache(store)
+            _caches[store.directory] = cache
+        return cache
@@ -0,0 +1,90 @@
+import os
+import threading
+from typing import Any, Dict, FrozenSet, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS'})
+
+_sessions: Dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that applies a default (connect, read) timeout to every request."""
+
+    def __init__(self, *args: Any, timeout: Optional[Tuple[float, float]] = None, **kwargs: Any):
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request: requests.PreparedRequest, **kwargs: Any) -> requests.Response:
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        return super().send(request, **kwargs)
+
+
+def create_session(prefix: str, retry_methods: FrozenSet[str] = IDEMPOTENT_METHODS) -> requests.Session:
+    """Build a pooled session configured from <prefix>_HTTP_* environment variables."""
+    pool_size = int(os.getenv(f'{prefix}_HTTP_POOL_SIZE', '20'))
+    connect_timeout = float(os.getenv(f'{prefix}_HTTP_CONNECT_TIMEOUT', '5'))
+    read_timeout = float(os.getenv(f'{prefix}_HTTP_READ_TIMEOUT', '30'))
+    max_retries = int(os.getenv(f'{prefix}_HTTP_MAX_RETRIES', '3'))
+    backoff_factor = float(os.getenv(f'{prefix}_HTTP_BACKOFF', '0.5'))
+
+    retry = Retry(
+        total=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=retry_methods,
+        respect_retry_after_header=True,
+        # Hand the final response back instead of raising, callers check status codes
+        raise_on_status=False
+    )
+    adapter = TimeoutHTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=retry,
+        timeout=(connect_timeout, read_timeout)
+    )
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def shared_session(prefix: str, retry_methods: FrozenSet[str] = IDEMPOTENT_METHODS) -> requests.Session:
+    """Return the process-wide session for prefix, creating it on first use."""
+    with _sessions_lock:
+        session = _sessions.get(prefix)
+        if session is None:
+            session = create_session(prefix, retry_methods)
+            _sessions[prefix] = session
+        return session
+
+
+def pool_stats(session: requests.Session) -> Dict[str, Any]:
+    """Report how many requests were served by reused pooled connections."""
+    total_requests = 0
+    total_connections = 0
+    for adapter in {id(a): a for a in session.adapters.values()}.values():
+        manager = getattr(adapter, 'poolmanager', None)
+        if manager is None:
+            continue
+        for key in manager.pools.keys():
+            pool = manager.pools.get(key)
+            if pool is None:
+                continue
+            total_requests += pool.num_requests
+            total_connections += pool.num_connections
+
+    reused = max(0, total_requests - total_connections)
+    return {
+        'requests': total_requests,
+        'connections': total_connections,
+        'reused': reused,
+        'hit_rate': round(reused / total_requests, 4) if total_requests else 0.0
+    }
@@ -0,0 +1,117 @@
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional, Pattern, Tuple
+
+# Paths that hold dependencies or build output rather than the project's own code
+DEFAULT_IGNORE_GLOBS = (
+    'node_modules/', 'bower_components/', 'vendor/', 'third_party/', 'dist/',
+    '.venv/', 'venv/', '__pycache__/',
+    '*.min.js', '*.min.css', '*.map', '*.lock', 'package-lock.json'
+)
+
+# .gitattributes attributes that exclude a path, and the skip reason reported for each
+GITATTRIBUTES_REASONS = {'linguist-vendored': 'vendored', 'linguist-generated': 'generated'}
+
+
+def glob_to_regex(pattern: str, directories: bool = True) -> Pattern:
+    """Compile a gitignore-style glob.
+
+    '*' and '?' do not cross '/', '**' does. A pattern without a '/' (other
+    than a trailing one) matches at any depth; one with a '/' is anchored
+    at the root. With directories, a pattern matching a directory also
+    matches everything inside it, as in .gitignore; .gitattributes
+    patterns only ever match files.
+    """
+    anchored = '/' in pattern.rstrip('/')
+    pattern = pattern.strip('/') if anchored else pattern.rstrip('/')
+    parts = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith('**/', i):
+            parts.append('(?:.*/)?')
+            i += 3
+        elif pattern.startswith('**', i):
+            parts.append('.*')
+            i += 2
+        elif pattern[i] == '*':
+            parts.append('[^/]*')
+            i += 1
+        elif pattern[i] == '?':
+            parts.append('[^/]')
+            i += 1
+        else:
+            parts.append(re.escape(pattern[i]))
+            i += 1
+    body = ''.join(parts)
+    return re.compile(('' if anchored else '(?:.*/)?') + body + ('(?:/.*)?$' if directories else '$'))
+
+
+def parse_gitattributes(content: str, base: str = '') -> List[Tuple[Pattern, Dict[str, bool]]]:
+    """Return (pattern, {attribute: set?}) rules for the linguist attributes in a .gitattributes.
+
+    base is the directory holding the file; its patterns are relative to it.
+    """
+    rules = []
+    for line in content.splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        fields = line.split()
+        pattern, attributes = fields[0], fields[1:]
+        values = {}
+        for attribute in attributes:
+            name, _, value = attribute.lstrip('-!').partition('=')
+            if name not in GITATTRIBUTES_REASONS:
+                continue
+            # 'attr' and 'attr=true' set it; '-attr', '!attr' and 'attr=false' unset it
+            values[name] = not attribute.startswith(('-', '!')) and value.lower() not in ('false', '0')
+        if values:
+            regex = glob_to_regex(pattern, directories=False)
+            if base:
+                regex = re.compile(re.escape(base.rstrip('/') + '/') + regex.pattern)
+            rules.append((regex, values))
+    return rules
+
+
+class PathFilter:
+    """Decide from the tree listing alone which files are not worth fetching.
+
+    A file is skipped when it matches an ignore glob, is marked
+    linguist-vendored or linguist-generated in a .gitattributes, is larger
+    than max_file_bytes according to the listing, or is binary by its
+    extension.
+    """
+
+    def __init__(self, ignore_globs: Iterable[str] = DEFAULT_IGNORE_GLOBS, max_file_bytes: int = 0,
+                 is_binary: Optional[Callable[[str], bool]] = None):
+        self.ignore = [glob_to_regex(glob) for glob in ignore_globs if glob.strip()]
+        self.max_file_bytes = max_file_bytes
+        self.is_binary = is_binary
+        # (depth, pattern, attributes) from every .gitattributes, shallowest first
+        self.attribute_rules: List[Tuple[int, Pattern, Dict[str, bool]]] = []
+
+    def add_gitattributes(self, path: str, content: str) -> None:
+        base = path.rsplit('/', 1)[0] if '/' in path else ''
+        depth = path.count('/')
+        self.attribute_rules.extend((depth, regex, values) for regex, values in parse_gitattributes(content, base))
+        # A deeper .gitattributes overrides a shallower one, so its lines must come later
+        self.attribute_rules.sort(key=lambda rule: rule[0])
+
+    def skip_reason(self, item: Dict[str, Any]) -> Optional[str]:
+        """Return why a listed file should not be fetched, or None to fetch it."""
+        path = item.get('path', '')
+        if any(regex.match(path) for regex in self.ignore):
+            return 'ignored'
+        if self.attribute_rules:
+            # Like git, the last matching line decides each attribute
+            attributes = {}
+            for _, regex, values in self.attribute_rules:
+                if regex.match(path):
+                    attributes.update(values)
+            for name, reason in GITATTRIBUTES_REASONS.items():
+                if attributes.get(name):
+                    return reason
+        if self.max_file_bytes and (item.get('size') or 0) > self.max_file_bytes:
+            return 'too_large'
+        if self.is_binary and self.is_binary(path):
+            return 'binary'
+        return None
@@ -0,0 +1,173 @@
+import os
+import threading
+import time
+from typing import Any, Dict, Mapping, Optional
+
+
+class TokenBucket:
+    """Thread-safe token bucket that blocks callers until a token is available."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def set_rate(self, rate: float) -> None:
+        with self._lock:
+            self._refill()
+            self.rate = rate
+
+    def acquire(self) -> None:
+        """Take one token, sleeping outside the lock until one is available."""
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class GitHubRateLimiter:
+    """Process-wide quota tracker and request pacer for one GitHub credential.
+
+    The hourly quota is tracked from the X-RateLimit-* response headers.
+    Each request reserves one unit from acquire() until release(), and the
+    quota available is the last value GitHub reported minus the requests
+    still in flight, so concurrent threads cannot overshoot it and answers
+    that cost nothing (304s) do not wear it down.
+    Requests are paced by a token bucket at up to max_rate per second; once
+    the remaining quota falls below a tenth of the limit, the rate is lowered
+    so what is left lasts until the reset.
+    """
+
+    def __init__(self, max_rate: float, burst: float, reserve: int, min_rate: float = 0.5):
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.reserve = reserve
+        self.bucket = TokenBucket(max_rate, burst)
+        self.limit: Optional[int] = None
+        # Last X-RateLimit-Remaining from GitHub, and that less the requests in flight
+        self.server_remaining: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.in_flight = 0
+        self.reset = 0.0
+        self._lock = threading.Lock()
+
+    def _window_expired(self) -> bool:
+        # Caller holds the lock
+        if self.remaining is not None and time.time() >= self.reset:
+            self.server_remaining = None
+            self.remaining = None
+            self.bucket.set_rate(self.max_rate)
+        return self.remaining is None
+
+    def has_quota(self) -> bool:
+        """True if requests can be made now without exhausting the quota."""
+        with self._lock:
+            return self._window_expired() or self.remaining > self.reserve
+
+    def headroom(self) -> float:
+        """Requests left before the reserve is reached (infinite if unknown)."""
+        with self._lock:
+            if self._window_expired():
+                return float('inf')
+            return self.remaining - self.reserve
+
+    def seconds_until_reset(self) -> float:
+        with self._lock:
+            return max(0.0, self.reset - time.time())
+
+    def acquire(self) -> bool:
+        """Reserve quota for one request and wait for a pacing token.
+
+        Returns False without waiting if the quota is exhausted. Every True
+        must be followed by release() once the response has arrived.
+        """
+        with self._lock:
+            if not self._window_expired() and self.remaining <= self.reserve:
+                return False
+            self.in_flight += 1
+            if self.server_remaining is not None:
+                self.remaining = self.server_remaining - self.in_flight
+        self.bucket.acquire()
+        return True
+
+    def release(self) -> None:
+        """End the reservation taken by acquire(), after update() has seen the response."""
+        with self._lock:
+            self.in_flight = max(self.in_flight - 1, 0)
+            if self.server_remaining is not None:
+                self.remaining = self.server_remaining - self.in_flight
+
+    def exhaust(self) -> None:
+        """Mark the quota as used up until the known reset, or for an hour if unknown."""
+        with self._lock:
+            self.server_remaining = 0
+            self.remaining = 0
+            if self.reset <= time.time():
+                self.reset = time.time() + 3600
+
+    def update(self, headers: Mapping[str, str]) -> None:
+        """Sync quota and pacing with the X-RateLimit-* headers of a response."""
+        if 'X-RateLimit-Remaining' not in headers:
+            return
+        # GraphQL and search have quotas of their own
+        if headers.get('X-RateLimit-Resource', 'core') != 'core':
+            return
+        try:
+            remaining = int(headers['X-RateLimit-Remaining'])
+            reset = float(headers.get('X-RateLimit-Reset', 0))
+            limit = int(headers['X-RateLimit-Limit']) if 'X-RateLimit-Limit' in headers else None
+        except ValueError:
+            return
+
+        with self._lock:
+            # The response's own request is still counted in flight until release()
+            self.server_remaining = remaining
+            remaining -= self.in_flight
+            self.remaining = remaining
+            self.reset = reset
+            self.limit = limit or self.limit
+
+            rate = self.max_rate
+            if self.limit and remaining < self.limit / 10:
+                spendable = max(remaining - self.reserve, 0)
+                rate = min(self.max_rate, max(self.min_rate, spendable / max(reset - time.time(), 1.0)))
+        self.bucket.set_rate(rate)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'limit': self.limit,
+                'remaining': self.remaining,
+                'in_flight': self.in_flight,
+                'reset': self.reset,
+                'rate': round(self.bucket.rate, 3)
+            }
+
+
+_limiters: Dict[str, GitHubRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(key: str) -> GitHubRateLimiter:
+    """Return the process-wide limiter for a credential, creating it on first use."""
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = GitHubRateLimiter(
+                max_rate=float(os.getenv('GITHUB_MAX_REQUESTS_PER_SECOND', '20')),
+                burst=float(os.getenv('GITHUB_REQUEST_BURST', '20')),
+                reserve=int(os.getenv('GITHUB_RATE_LIMIT_RESERVE', '10'))
+            )
+            _limiters[key] = limiter
+        return limiter
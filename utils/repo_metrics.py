@@ -0,0 +1,70 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+class ContributorMetrics:
+    """Contributor metrics accumulated one contributor at a time."""
+
+    def __init__(self, active_threshold: int = 10):
+        self.active_threshold = active_threshold
+        self.count = 0
+        self.total_contributions = 0
+        self.active_contributors = 0
+
+    def add(self, contributor: Dict[str, Any]) -> None:
+        if not isinstance(contributor, dict):
+            return
+        contributions = contributor.get('contributions', 0) or 0
+        self.count += 1
+        self.total_contributions += contributions
+        if contributions > self.active_threshold:
+            self.active_contributors += 1
+
+    @property
+    def avg_contributions(self) -> float:
+        return self.total_contributions / self.count if self.count else 0
+
+
+class IssueMetrics:
+    """Issue metrics accumulated one issue at a time."""
+
+    def __init__(self, now: Optional[datetime] = None):
+        self.now = now or datetime.now(timezone.utc)
+        self.count = 0
+        self.open_issues = 0
+        self._dated = 0
+        self._age_seconds = 0.0
+
+    def add(self, issue: Dict[str, Any]) -> None:
+        if not isinstance(issue, dict):
+            return
+        self.count += 1
+        if issue.get('state') == 'open':
+            self.open_issues += 1
+        created_at = issue.get('created_at')
+        if created_at:
+            try:
+                created = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
+                if created.tzinfo is None:
+                    created = created.replace(tzinfo=timezone.utc)
+            except (TypeError, ValueError):
+                return
+            self._dated += 1
+            self._age_seconds += (self.now - created).total_seconds()
+
+    @property
+    def issue_response_time(self) -> int:
+        """Mean age of the issues in whole days (7 when no issue has a date)."""
+        if not self._dated:
+            return 7
+        return int(self._age_seconds / self._dated // (24 * 3600))
+
+
+def collect(items: Iterable[Dict[str, Any]], metrics: Any, keep: int) -> Tuple[List[Dict[str, Any]], Any]:
+    """Feed every item to metrics while keeping only the first keep items."""
+    kept = []
+    for item in items:
+        metrics.add(item)
+        if len(kept) < keep:
+            kept.append(item)
+    return kept, metrics
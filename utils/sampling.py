@@ -0,0 +1,207 @@
+import hashlib
+import math
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# File names (without extension) that usually start a program
+ENTRY_POINT_NAMES = {'main', '__main__', 'app', 'index', 'server', 'manage', 'cli', 'wsgi', 'asgi'}
+
+MANIFESTS = ('manifests',)
+ENTRY_POINTS = ('entry points',)
+
+Stratum = Tuple[str, ...]
+
+
+def is_entry_point(path: str) -> bool:
+    name = path.rsplit('/', 1)[-1]
+    return name.rsplit('.', 1)[0].lower() in ENTRY_POINT_NAMES
+
+
+def stratum_of(path: str, is_manifest: Callable[[str], bool]) -> Stratum:
+    """Manifests and entry points form their own strata; other files are grouped by top directory and extension."""
+    if is_manifest(path):
+        return MANIFESTS
+    if is_entry_point(path):
+        return ENTRY_POINTS
+    directory = path.split('/', 1)[0] if '/' in path else '.'
+    name = path.rsplit('/', 1)[-1]
+    extension = name.rsplit('.', 1)[-1].lower() if '.' in name else ''
+    return directory, extension
+
+
+def _stable_rank(path: str) -> str:
+    # A hash rather than random() so the same files are picked on every run
+    return hashlib.sha1(path.encode('utf-8', 'surrogateescape')).hexdigest()
+
+
+class AnalysisBudget:
+    """Caps on the files, bytes and seconds one analysis may spend on file contents.
+
+    A cap of 0 disables it. Files are planned in priority order: manifests,
+    then entry points, then the rest of the listing interleaved across
+    strata in proportion to their size, so any prefix of the plan is a
+    stratified sample with the largest directories represented first.
+    """
+
+    def __init__(self, max_files: int = 0, max_bytes: int = 0, max_seconds: float = 0):
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.max_files or self.max_bytes or self.max_seconds)
+
+    def deadline(self) -> Optional[float]:
+        """time.monotonic() value after which no more contents should be analyzed."""
+        return time.monotonic() + self.max_seconds if self.max_seconds else None
+
+    def order(self, files: List[Dict[str, Any]], strata: Dict[str, Stratum]) -> List[Dict[str, Any]]:
+        """Return files in the order they should be analyzed."""
+        groups: Dict[Stratum, List[Dict[str, Any]]] = {}
+        for item in files:
+            groups.setdefault(strata[item.get('path', '')], []).append(item)
+
+        ordered = []
+        # Shallow manifests and entry points first
+        for key in (MANIFESTS, ENTRY_POINTS):
+            ordered.extend(sorted(groups.pop(key, []), key=lambda item: (item.get('path', '').count('/'), item.get('path', ''))))
+
+        # The i-th file of a stratum of n sorts at (i + 0.5) / n, so every prefix
+        # takes about the same fraction of each stratum; larger strata win ties
+        positions = []
+        for key, items in groups.items():
+            items.sort(key=lambda item: _stable_rank(item.get('path', '')))
+            for i, item in enumerate(items):
+                positions.append(((i + 0.5) / len(items), -len(items), key, i, item))
+        positions.sort(key=lambda position: position[:4])
+        ordered.extend(position[4] for position in positions)
+        return ordered
+
+    def plan(self, files: List[Dict[str, Any]],
+             strata: Dict[str, Stratum]) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """Return (files to analyze in order, caps that excluded files).
+
+        Files whose listed size would overrun the byte cap are passed over
+        in favour of smaller ones further down the order.
+        """
+        selected = []
+        stopped_by = []
+        used_bytes = 0
+        for item in self.order(files, strata):
+            if self.max_files and len(selected) >= self.max_files:
+                stopped_by.append('max_files')
+                break
+            size = item.get('size') or 0
+            if self.max_bytes and used_bytes + size > self.max_bytes:
+                if 'max_bytes' not in stopped_by:
+                    stopped_by.append('max_bytes')
+                continue
+            used_bytes += size
+            selected.append(item)
+        return selected, stopped_by
+
+
+def _confidence(coverage: float, relative_error: float, unsampled_share: float) -> str:
+    if coverage >= 0.8 or (relative_error <= 0.05 and unsampled_share <= 0.05):
+        return 'high'
+    if relative_error <= 0.15 and unsampled_share <= 0.2:
+        return 'medium'
+    return 'low'
+
+
+def _add_pooled_estimate(metric: str, unsampled: List[Tuple[str, int]], pooled: List[Tuple[Dict[str, int], int]],
+                         totals: Dict[str, float], variances: Dict[str, float]) -> None:
+    """Estimate files in never-sampled strata at the rate seen across every analyzed file."""
+    values = [complexity.get(metric) or 0 for complexity, _ in pooled]
+    sizes = [size for _, size in pooled]
+    count, n = len(unsampled), len(pooled)
+    if all(size for _, size in unsampled) and sum(sizes) > 0:
+        ratio = sum(values) / sum(sizes)
+        totals[metric] += ratio * sum(size for _, size in unsampled)
+        residuals = [value - ratio * size for value, size in zip(values, sizes)]
+    else:
+        mean = sum(values) / n
+        totals[metric] += count * mean
+        residuals = [value - mean for value in values]
+    if n > 1:
+        variances[metric] += count * count * sum(residual ** 2 for residual in residuals) / (n - 1) / n
+
+
+def extrapolate(files: List[Dict[str, Any]], results: Dict[str, Optional[Dict[str, Any]]],
+                strata: Dict[str, Stratum]) -> Dict[str, Any]:
+    """Estimate whole-repository language and complexity totals from the analyzed files.
+
+    Complexity totals use a stratified ratio estimator: each stratum's
+    sampled lines (functions, classes) per byte is scaled to the listed
+    size of the whole stratum, which also corrects for the byte cap
+    favouring small files. Strata without listed sizes fall back to the
+    per-file mean. Strata with no analyzed file are filled in at the
+    pooled rate of all analyzed files and counted in unsampled_files. The
+    sampling variance gives a 95% interval.
+    """
+    members: Dict[Stratum, List[Tuple[str, int]]] = {}
+    for item in files:
+        path = item.get('path', '')
+        members.setdefault(strata[path], []).append((path, item.get('size') or 0))
+
+    metrics = ('lines', 'functions', 'classes')
+    totals = {metric: 0.0 for metric in metrics}
+    variances = {metric: 0.0 for metric in metrics}
+    languages: Dict[str, float] = {}
+    analyzed_files = 0
+    unsampled: List[Tuple[str, int]] = []
+    pooled: List[Tuple[Dict[str, int], int]] = []
+    for stratum in members.values():
+        sample = [(results[path], size) for path, size in stratum if path in results]
+        count, n = len(stratum), len(sample)
+        analyzed_files += n
+        if not n:
+            unsampled.extend(stratum)
+            continue
+        pooled.extend(((result or {}).get('complexity', {}), size) for result, size in sample)
+        for result, _ in sample:
+            if result and result.get('language'):
+                languages[result['language']] = languages.get(result['language'], 0) + count / n
+
+        sizes = [size for _, size in sample]
+        use_ratio = all(size for _, size in stratum) and sum(sizes) > 0
+        for metric in metrics:
+            values = [(result or {}).get('complexity', {}).get(metric) or 0 for result, _ in sample]
+            if use_ratio:
+                ratio = sum(values) / sum(sizes)
+                totals[metric] += ratio * sum(size for _, size in stratum)
+                residuals = [value - ratio * size for value, size in zip(values, sizes)]
+            else:
+                mean = sum(values) / n
+                totals[metric] += count * mean
+                residuals = [value - mean for value in values]
+            if 1 < n < count:
+                sample_variance = sum(residual ** 2 for residual in residuals) / (n - 1)
+                variances[metric] += count * count * (1 - n / count) * sample_variance / n
+
+    if unsampled and pooled:
+        for metric in metrics:
+            _add_pooled_estimate(metric, unsampled, pooled, totals, variances)
+
+    total_files = len(files)
+    unsampled_files = len(unsampled)
+    estimated_totals = {}
+    for metric in metrics:
+        margin = 1.96 * math.sqrt(variances[metric])
+        estimated_totals[metric] = {
+            'estimate': round(totals[metric]),
+            'low': max(0, round(totals[metric] - margin)),
+            'high': round(totals[metric] + margin)
+        }
+    relative_error = 1.96 * math.sqrt(variances['lines']) / totals['lines'] if totals['lines'] else 1.0
+    coverage = analyzed_files / total_files if total_files else 1.0
+    return {
+        'total_files': total_files,
+        'analyzed_files': analyzed_files,
+        'coverage': round(coverage, 3),
+        'unsampled_files': unsampled_files,
+        'estimated_languages': {lang: round(count) for lang, count in languages.items()},
+        'estimated_totals': estimated_totals,
+        'confidence': _confidence(coverage, relative_error, unsampled_files / total_files if total_files else 0)
+    }
@@ -0,0 +1,75 @@
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it
+    is still running wait and receive the same result (or exception).
+    Nothing is cached once the call finishes. Progress the running call
+    reports for its key reaches every caller waiting on it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+        # Progress callbacks of every caller waiting on a key, and the last message reported
+        self._listeners: Dict[Hashable, List[Callable[[str], None]]] = {}
+        self._last_progress: Dict[Hashable, str] = {}
+        self._executions = 0
+        self._shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any],
+           progress: Optional[Callable[[str], None]] = None) -> Any:
+        """Run fn for key, or wait for the call already running it.
+
+        progress, if given, is called with the latest message reported for
+        key and with every later one until the call finishes.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self._calls[key] = future
+                self._executions += 1
+            else:
+                self._shared += 1
+            last = self._last_progress.get(key)
+            if progress:
+                self._listeners.setdefault(key, []).append(progress)
+
+        if progress and last is not None:
+            progress(last)
+
+        if is_leader:
+            try:
+                future.set_result(fn())
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                with self._lock:
+                    self._calls.pop(key, None)
+                    self._listeners.pop(key, None)
+                    self._last_progress.pop(key, None)
+        return future.result()
+
+    def report(self, key: Hashable, message: str) -> None:
+        """Pass a progress message from the call running key to everyone waiting on it."""
+        with self._lock:
+            if key not in self._calls:
+                return
+            self._last_progress[key] = message
+            listeners = list(self._listeners.get(key, ()))
+        for listener in listeners:
+            listener(message)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'in_flight': len(self._calls),
+                'executions': self._executions,
+                'shared': self._shared
+            }